@@ -0,0 +1,251 @@
+import glob
+import os
+import re
+import numpy as np
+import random
+
+from ataxx_engine import BLOCKED, PLAYER_2, get_geometry
+from ataxx_symmetry import symmetry_group
+
+# Trained weights are written here by train_selfplay.py as
+# simplenn_<rows>x<cols>_v<version>.npz, one series per board size
+CHECKPOINT_DIR = "models"
+
+
+def checkpoint_path(rows, cols, version, directory=CHECKPOINT_DIR):
+    return os.path.join(directory, f"simplenn_{rows}x{cols}_v{version:04d}.npz")
+
+
+def latest_checkpoint(rows, cols, directory=CHECKPOINT_DIR):
+    # Returns (version, path) of the newest checkpoint for the board size, or None
+    pattern = re.compile(rf"simplenn_{rows}x{cols}_v(\d+)\.npz$")
+    found = []
+    for path in glob.glob(os.path.join(directory, f"simplenn_{rows}x{cols}_v*.npz")):
+        match = pattern.search(os.path.basename(path))
+        if match:
+            found.append((int(match.group(1)), path))
+    return max(found) if found else None
+
+
+def save_checkpoint(model, rows, cols, directory=CHECKPOINT_DIR):
+    latest = latest_checkpoint(rows, cols, directory)
+    version = latest[0] + 1 if latest else 1
+    os.makedirs(directory, exist_ok=True)
+    path = checkpoint_path(rows, cols, version, directory)
+    model.save(path)
+    return path
+
+
+class SimpleNN:
+    def __init__(self, input_size, hidden_size, output_size):
+        self.w1 = np.random.randn(input_size, hidden_size) / np.sqrt(input_size)
+        self.w2 = np.random.randn(hidden_size, output_size) / np.sqrt(hidden_size)
+
+    def forward(self, x):
+        self.z1 = np.dot(x, self.w1)
+        self.a1 = np.tanh(self.z1)
+        self.z2 = np.dot(self.a1, self.w2)
+        return self.z2
+
+    # Both forward and backward take either a single flattened board or a
+    # (batch_size, input_size) array of them. For a batch the gradients are
+    # averaged, so one call is a single minibatch gradient step.
+    def backward(self, x, y, learning_rate=0.01):
+        x = np.atleast_2d(x)
+        y = np.asarray(y, dtype=float).reshape(len(x), -1)
+        self.forward(x)
+        delta2 = (self.z2 - y) / len(x)
+        delta1 = np.dot(delta2, self.w2.T) * (1 - self.a1**2)
+        self.w2 -= learning_rate * np.dot(self.a1.T, delta2)
+        self.w1 -= learning_rate * np.dot(x.T, delta1)
+
+    def save(self, path):
+        np.savez(path, w1=self.w1, w2=self.w2)
+
+    def load(self, path):
+        with np.load(path) as weights:
+            if weights["w1"].shape != self.w1.shape or weights["w2"].shape != self.w2.shape:
+                raise ValueError(f"Checkpoint {path} does not match the network size")
+            self.w1 = weights["w1"]
+            self.w2 = weights["w2"]
+
+
+def canonical_states(states, gathers):
+    # Turns every flattened board in the (n, rows*cols) array into the smallest of
+    # its transforms (compared cell by cell). gathers holds one index array per
+    # transform, so states[:, gather] is the whole batch turned by it.
+    best = states[:, gathers[0]]
+    for gather in gathers[1:]:
+        candidate = states[:, gather]
+        differs = candidate != best
+        first = np.argmax(differs, axis=1)
+        rows = np.arange(len(best))
+        smaller = differs[rows, first] & (candidate[rows, first] < best[rows, first])
+        best[smaller] = candidate[smaller]
+    return best
+
+
+# Experience replay memory kept in preallocated NumPy ring buffers, so storing a
+# transition is a row write and a minibatch comes out as ready-made arrays.
+# Adding a transition that is already in the buffer only refreshes it, so with
+# canonical states the buffer holds each distinct transition once.
+class ReplayBuffer:
+    def __init__(self, capacity, state_size, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros((capacity, 4), dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.index = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+        # slot_keys[i] is the key of the transition in row i, slots maps it back
+        self.slot_keys = [None] * capacity
+        self.slots = {}
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        state = np.asarray(state, dtype=np.float32)
+        next_state = np.asarray(next_state, dtype=np.float32)
+        key = state.tobytes() + next_state.tobytes()
+        i = self.slots.get(key)
+        if i is None:
+            i = self.index
+            if self.slot_keys[i] is not None:
+                del self.slots[self.slot_keys[i]]
+            self.slot_keys[i] = key
+            self.slots[key] = i
+            self.index = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        self.states[i] = state
+        self.actions[i] = action if action is not None else (-1, -1, -1, -1)
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+
+    def sample(self, batch_size):
+        batch = self.rng.choice(self.size, size=batch_size, replace=False)
+        return self.states[batch], self.actions[batch], self.rewards[batch], self.next_states[batch], self.dones[batch]
+
+
+# The AI drives the headless AtaxxPosition from ataxx_engine, so it can be used
+# both by the GameScreen and without Kivy at all. The network always scores
+# boards for player 2, the computer's side in the game.
+#
+# With use_symmetry the network only ever sees boards in canonical orientation
+# (the smallest of the rotations and reflections the level's blocked cells
+# allow), both when it is trained and when it scores moves, so the replay
+# memory doesn't fill up with mirrored copies of the same experience. Colours
+# are never swapped here, since the network's score depends on them.
+class AtaxxAI:
+    def __init__(self, rows, cols, player=PLAYER_2, load_checkpoint=True, use_symmetry=True, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.player = player
+        self.use_symmetry = use_symmetry
+        self.gathers = {}
+        self.model = SimpleNN(rows * cols, 64, 1)
+        # seed only makes the replay sampling repeatable; the weights and the
+        # exploration use NumPy's global generator
+        self.memory = ReplayBuffer(10000, rows * cols, seed)
+        self.epsilon = 1.0
+        self.epsilon_min = 0.01
+        self.epsilon_decay = 0.995
+        self.gamma = 0.95
+        self.checkpoint = None
+
+        # A network that has already been trained by self-play starts out playing
+        # its best moves instead of exploring at random
+        if load_checkpoint:
+            latest = latest_checkpoint(rows, cols)
+            if latest:
+                try:
+                    self.model.load(latest[1])
+                    self.checkpoint = latest[1]
+                    self.epsilon = self.epsilon_min
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not load checkpoint {latest[1]}: {e}")
+
+        # neighbours[target] marks the cells a piece landing on target captures
+        geometry = get_geometry(rows, cols)
+        self.neighbours = np.array(
+            [[bool(mask >> square & 1) for square in range(geometry.size)] for mask in geometry.clone_masks],
+            dtype=bool,
+        ).reshape(geometry.size, geometry.size)
+
+    def get_state(self, position):
+        return np.array(position.board).flatten()
+
+    def symmetry_gathers(self, state):
+        # Index arrays for the transforms of the board the state was taken from,
+        # cached per layout of blocked cells
+        blocked_squares = np.flatnonzero(state == BLOCKED)
+        key = blocked_squares.tobytes()
+        gathers = self.gathers.get(key)
+        if gathers is None:
+            blocked = sum(1 << int(square) for square in blocked_squares)
+            # states[:, gather] puts the cell that perm moves onto square d at d
+            gathers = [np.argsort(perm) for perm in symmetry_group(self.rows, self.cols, blocked)]
+            gathers = self.gathers[key] = np.array(gathers, dtype=np.intp)
+        return gathers
+
+    def canonical(self, states):
+        # Canonical form of one flattened board or of a (n, rows*cols) batch of
+        # boards from the same level
+        states = np.asarray(states)
+        if not self.use_symmetry:
+            return states
+        batch = np.atleast_2d(states)
+        canonical = canonical_states(batch, self.symmetry_gathers(batch[0]))
+        return canonical if states.ndim > 1 else canonical[0]
+
+    def successor_states(self, position, moves):
+        # Builds the flattened board after every move as one (len(moves), rows*cols)
+        # array: place the piece, empty the source of jumps, then flip captures
+        player = position.active_player
+        opponent = 3 - player
+        move_array = np.array(moves, dtype=np.intp).reshape(-1, 4)
+        src = move_array[:, 0] * self.cols + move_array[:, 1]
+        target = move_array[:, 2] * self.cols + move_array[:, 3]
+        is_jump = np.maximum(np.abs(move_array[:, 0] - move_array[:, 2]),
+                             np.abs(move_array[:, 1] - move_array[:, 3])) == 2
+        rows = np.arange(len(move_array))
+
+        states = np.tile(self.get_state(position), (len(move_array), 1))
+        states[rows[is_jump], src[is_jump]] = 0
+        states[self.neighbours[target] & (states == opponent)] = player
+        states[rows, target] = player
+        return states
+
+    def evaluate_moves(self, position, moves):
+        return self.model.forward(self.canonical(self.successor_states(position, moves)))[:, 0]
+
+    def get_action(self, position, stop_event=None, time_limit=None):
+        # The network answers at once, so stop_event and time_limit go unused
+        valid_moves = position.legal_moves()
+        if not valid_moves:
+            return None
+        if np.random.rand() <= self.epsilon:
+            return random.choice(valid_moves)
+
+        q_values = self.evaluate_moves(position, valid_moves)
+        if position.active_player != PLAYER_2:
+            q_values = -q_values
+        return valid_moves[int(np.argmax(q_values))]
+
+    def remember(self, state, action, reward, next_state, done):
+        # The action is kept as played; only the boards are made canonical
+        self.memory.add(self.canonical(state), action, reward, self.canonical(next_state), done)
+
+    def replay(self, batch_size):
+        if len(self.memory) < batch_size:
+            return
+        states, actions, rewards, next_states, dones = self.memory.sample(batch_size)
+        next_q = self.model.forward(next_states)[:, 0]
+        targets = rewards + self.gamma * next_q * ~dones
+        self.model.backward(states, targets)
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
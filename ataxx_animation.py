@@ -0,0 +1,125 @@
+"""Board animations on a single timeline.
+
+A move is played as one timeline: the piece travelling, its landing, the
+captured pieces changing colour and the sounds that go with them. Everything on
+the timeline is updated by one per-frame callback instead of an Animation per
+piece. Each step happens at a fixed time on the timeline, so the game state
+(which changes when the piece lands) and the board never get out of step.
+
+The speed says how fast the timeline runs. A speed of 0 skips the animations
+and plays everything out at once.
+"""
+
+import heapq
+import itertools
+
+from kivy.animation import AnimationTransition
+from kivy.clock import Clock
+
+# Timeline speeds offered in the settings
+SPEEDS = {"Normal": 1.0, "Fast": 3.0, "Off": 0.0}
+
+
+def interpolate(start, end, progress):
+    if isinstance(end, (int, float)):
+        return start + (end - start) * progress
+    return [a + (b - a) * progress for a, b in zip(start, end)]
+
+
+class Tween:
+    # Moves properties of target to the given values between start and start + duration
+    def __init__(self, target, start, duration, transition, values):
+        self.target = target
+        self.start = start
+        self.duration = duration
+        self.transition = transition
+        self.values = values
+        # The values the properties had when the tween began
+        self.origin = None
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def update(self, elapsed):
+        # Returns True once the tween is finished
+        if elapsed < self.start:
+            return False
+        if self.origin is None:
+            self.origin = {name: getattr(self.target, name) for name in self.values}
+        progress = 1.0 if elapsed >= self.end else (elapsed - self.start) / self.duration
+        eased = self.transition(progress)
+        for name, value in self.values.items():
+            setattr(self.target, name, interpolate(self.origin[name], value, eased))
+        return progress >= 1.0
+
+
+class BoardAnimator:
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.tweens = []
+        # (time, order, callback), the order keeps calls at the same time in sequence
+        self.calls = []
+        self.order = itertools.count()
+        self.elapsed = 0.0
+        self.event = None
+        self.on_finish = None
+
+    @property
+    def busy(self):
+        return bool(self.tweens or self.calls)
+
+    @property
+    def end(self):
+        ends = [tween.end for tween in self.tweens] + [time for time, _, _ in self.calls]
+        return max(ends, default=self.elapsed)
+
+    def tween(self, target, duration, delay=0.0, transition="linear", **values):
+        # Starts delay seconds from the current point of the timeline
+        self.tweens.append(Tween(target, self.elapsed + delay, duration, getattr(AnimationTransition, transition),
+                                 values))
+
+    def call(self, callback, delay=0.0):
+        heapq.heappush(self.calls, (self.elapsed + delay, next(self.order), callback))
+
+    def play(self, on_finish=None):
+        self.on_finish = on_finish
+        if self.speed <= 0:
+            self.finish()
+        elif self.event is None:
+            self.event = Clock.schedule_interval(self.step, 0)
+
+    def step(self, dt):
+        self.advance(dt * self.speed)
+
+    def advance(self, dt):
+        self.elapsed += dt
+        self.tweens = [tween for tween in self.tweens if not tween.update(self.elapsed)]
+        # A call can add to the timeline, e.g. the captures once the piece lands
+        while self.calls and self.calls[0][0] <= self.elapsed:
+            heapq.heappop(self.calls)[2]()
+        if not self.busy:
+            self.done()
+
+    def finish(self):
+        # Plays whatever is left of the timeline at once
+        while self.busy:
+            self.elapsed = self.end
+            self.advance(0.0)
+        self.done()
+
+    def done(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+        self.elapsed = 0.0
+        on_finish, self.on_finish = self.on_finish, None
+        if on_finish is not None:
+            on_finish()
+
+    def cancel(self):
+        # Drops the rest of the timeline without finishing it
+        self.tweens = []
+        self.calls = []
+        self.on_finish = None
+        self.done()
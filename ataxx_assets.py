@@ -0,0 +1,165 @@
+"""Loading the game's images, fonts and sounds while the title screen is shown.
+
+Without this, every image is read from disk the first time a screen or the
+robot's face needs it, so the first game screen and the robot's first change of
+emotion stall for a moment.
+
+The images are decoded on a background thread. Textures can only be made on
+the main thread, so once all of them are decoded they are drawn into a texture
+atlas there: one texture, rendered with an Fbo, with every image a region of it.
+Sounds and fonts are loaded on the main thread as well, since the audio and
+text providers aren't safe to use from other threads, but only one per frame,
+so the title screen keeps animating while they load.
+
+Images are looked up by their path below ./image (e.g. "bot/happy_robot.png").
+An image that is asked for before the atlas is ready is loaded on the spot.
+"""
+
+import os
+import threading
+
+from kivy.clock import Clock
+from kivy.core.image import Image as CoreImage, ImageLoader
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Callback, ClearBuffers, ClearColor, Color, Fbo, Rectangle
+from kivy.graphics.opengl import GL_ONE, GL_ZERO, glBlendFunc
+from kivy.metrics import sp
+
+from ataxx_audio import audio
+
+IMAGE_DIR = "./image"
+FONT_DIR = "./font"
+
+# The images the game shows; the screenshots in ./image are only for the readme
+IMAGES = ["grid_pattern.jpg", "bot/neutral_robot.png", "bot/happy_robot.png", "bot/sad_robot.png"]
+
+# Fonts are cached per size, so each size the game uses is warmed
+FONTS = [("retro_drip.ttf", 90), ("retro_drip.ttf", 50)]
+
+# Widest row of images on the atlas, and the gap between images so that their
+# edges don't bleed into each other when they are scaled
+ATLAS_WIDTH = 2048
+PADDING = 2
+
+
+class AssetPreloader:
+    def __init__(self, image_dir=IMAGE_DIR, font_dir=FONT_DIR, images=IMAGES, fonts=FONTS):
+        self.image_dir = image_dir
+        self.font_dir = font_dir
+        self.images = images
+        self.fonts = fonts
+        # The atlas, and the texture of every image
+        self.atlas = None
+        self.textures = {}
+        # (name, image) of the images decoded so far, filled by the loading thread
+        self.decoded = []
+        self.lock = threading.Lock()
+        # Loading steps that are left for the main thread, one per frame
+        self.steps = []
+        self.steps_done = 0
+        self.total = 0
+        self.finished = False
+        self.event = None
+        self.on_progress = None
+        self.on_finish = None
+
+    @property
+    def progress(self):
+        # Between 0 and 1
+        if self.finished or not self.total:
+            return 1.0
+        with self.lock:
+            decoded = len(self.decoded)
+        return (self.steps_done + decoded) / self.total
+
+    def start(self, on_progress=None, on_finish=None):
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.steps = [lambda name=name: audio.pool(name) for name in audio.names()]
+        self.steps += [lambda font=font, size=size: self.warm_font(font, size) for font, size in self.fonts]
+        self.total = len(self.images) + len(self.steps)
+        threading.Thread(target=self.decode_images, daemon=True).start()
+        self.event = Clock.schedule_interval(self.step, 0)
+
+    def decode_images(self):
+        # Runs on the loading thread. The image loader only decodes the file here,
+        # its texture would be made the first time it is asked for.
+        for name in self.images:
+            try:
+                image = ImageLoader.load(os.path.join(self.image_dir, name), keep_data=True, nocache=True)
+            except Exception as e:
+                print(f"Failed to load image: {name} ({e})")
+                image = None
+            with self.lock:
+                self.decoded.append((name, image))
+
+    def warm_font(self, font, size):
+        CoreLabel(text="Ataxx", font_name=os.path.join(self.font_dir, font), font_size=sp(size), bold=True).refresh()
+
+    def step(self, dt):
+        if self.steps:
+            self.steps.pop(0)()
+            self.steps_done += 1
+        if self.on_progress is not None:
+            self.on_progress(self.progress)
+        with self.lock:
+            decoded = len(self.decoded) == len(self.images)
+        if not self.steps and decoded:
+            self.build_atlas()
+            self.finish()
+
+    def build_atlas(self):
+        # Draws the decoded images in rows, tallest first, onto one texture
+        images = sorted(((name, image) for name, image in self.decoded if image is not None),
+                        key=lambda item: item[1].height, reverse=True)
+        self.decoded = []
+        places = []
+        x = y = row_height = width = 0
+        for name, image in images:
+            if x and x + image.width > ATLAS_WIDTH:
+                x = 0
+                y += row_height + PADDING
+                row_height = 0
+            places.append((name, image, x, y))
+            width = max(width, x + image.width)
+            row_height = max(row_height, image.height)
+            x += image.width + PADDING
+        if not places:
+            return
+        self.atlas = Fbo(size=(width, y + row_height))
+        with self.atlas:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            # The pixels are copied as they are instead of blended onto the cleared
+            # atlas, which would darken the soft edges of the robot images
+            Callback(lambda instruction: glBlendFunc(GL_ONE, GL_ZERO))
+            Color(1, 1, 1, 1)
+            for name, image, x, y in places:
+                Rectangle(texture=image.texture, pos=(x, y), size=image.size)
+            Callback(lambda instruction: None, reset_context=True)
+        self.atlas.draw()
+        for name, image, x, y in places:
+            self.textures[name] = self.atlas.texture.get_region(x, y, image.width, image.height)
+
+    def finish(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+        self.finished = True
+        on_finish, self.on_finish = self.on_finish, None
+        if on_finish is not None:
+            on_finish()
+
+    def texture(self, name):
+        # The texture of an image below the image directory, None if it can't be loaded
+        if name not in self.textures:
+            try:
+                self.textures[name] = CoreImage(os.path.join(self.image_dir, name)).texture
+            except Exception as e:
+                print(f"Failed to load image: {name} ({e})")
+                self.textures[name] = None
+        return self.textures[name]
+
+
+# The one asset preloader of the app
+assets = AssetPreloader()
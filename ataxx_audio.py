@@ -0,0 +1,127 @@
+"""Sound effects and music for the game.
+
+Every sound under ./sound is loaded once, while the title screen is shown (see
+ataxx_assets), instead of being read and decoded from disk each time it plays.
+Sounds are played by their path below ./sound (e.g. "move.mp3" or
+"bot/happy.mp3"). Each one keeps a small pool of voices, so a sound that is
+played again while it is still playing overlaps instead of cutting itself off;
+extra voices are only loaded once they are needed. When all of them are busy the
+one that started first is reused.
+
+The volume and mute setting apply to every sound and to the background music.
+"""
+
+import os
+
+from kivy.core.audio import SoundLoader
+
+SOUND_DIR = "./sound"
+SOUND_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+# The background music is streamed on its own and not preloaded as an effect
+MUSIC = "start_screen_music.mp3"
+
+# Copies of one sound that can play at the same time
+VOICES = 3
+
+
+class AudioManager:
+    def __init__(self, sound_dir=SOUND_DIR, voices=VOICES):
+        self.sound_dir = sound_dir
+        self.voices = voices
+        # Loaded voices of every sound, and which one to reuse next when all are busy
+        self.pools = {}
+        self.next_voice = {}
+        self.volume = 1.0
+        self.muted = False
+        self.music = None
+        self.music_volume = 1.0
+
+    def names(self):
+        # Every sound effect under the sound directory, without the music
+        names = []
+        for root, _, files in os.walk(self.sound_dir):
+            for file in sorted(files):
+                name = os.path.relpath(os.path.join(root, file), self.sound_dir).replace(os.sep, "/")
+                if file.endswith(SOUND_EXTENSIONS) and name != MUSIC:
+                    names.append(name)
+        return names
+
+    def preload(self):
+        for name in self.names():
+            self.pool(name)
+
+    def load(self, name):
+        sound = SoundLoader.load(os.path.join(self.sound_dir, name))
+        if sound is None:
+            print(f"Failed to load sound: {name}")
+        return sound
+
+    def pool(self, name):
+        # The voices of a sound; a sound that failed to load keeps an empty pool,
+        # so it is only tried once
+        if name not in self.pools:
+            sound = self.load(name)
+            self.pools[name] = [sound] if sound else []
+            self.next_voice[name] = 0
+        return self.pools[name]
+
+    def voice(self, name):
+        pool = self.pool(name)
+        if not pool:
+            return None
+        for sound in pool:
+            if sound.state != "play":
+                return sound
+        if len(pool) < self.voices:
+            sound = self.load(name)
+            if sound:
+                pool.append(sound)
+                return sound
+        index = self.next_voice[name]
+        self.next_voice[name] = (index + 1) % len(pool)
+        sound = pool[index]
+        sound.stop()
+        return sound
+
+    def play(self, name, volume=1.0):
+        if self.muted:
+            return None
+        sound = self.voice(name)
+        if sound:
+            sound.volume = volume * self.volume
+            sound.play()
+        return sound
+
+    def play_music(self, name=MUSIC, volume=1.0):
+        if self.music is None:
+            self.music = self.load(name)
+            if self.music is None:
+                return None
+            self.music.loop = True
+        self.music_volume = volume
+        self.update_music()
+        if not self.muted:
+            self.music.play()
+        return self.music
+
+    def update_music(self):
+        if self.music is not None:
+            self.music.volume = 0.0 if self.muted else self.music_volume * self.volume
+
+    def set_volume(self, volume):
+        self.volume = min(1.0, max(0.0, volume))
+        self.update_music()
+
+    def set_muted(self, muted):
+        self.muted = muted
+        self.update_music()
+        if self.music is not None:
+            if muted:
+                self.music.stop()
+            elif self.music.state != "play":
+                self.music.play()
+
+
+# The one audio manager of the app
+audio = AudioManager()
@@ -0,0 +1,147 @@
+"""Opening book for the computer player.
+
+The book is a flat binary file written by build_book.py: an 8 byte header
+followed by fixed-size records sorted by key. Each record holds the canonical
+hash of a position (see ataxx_symmetry, so one record covers every mirrored and
+colour swapped copy of it), the best move in canonical orientation, the search
+score, the depth it was searched to and a check value. The check is a CRC of
+the position itself in canonical orientation, independent of the hash, so that
+two positions whose hashes collide don't get each other's move. The file is memory-mapped and looked up
+with a binary search, so a book of millions of positions costs nothing to open
+and is never read into memory as a whole.
+
+A move is stored as two cell indexes of a byte each, so boards of more than
+MAX_CELLS cells (which the level editor can make) are never booked.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+from ataxx_symmetry import get_symmetry_keys, transform_mask
+
+BOOK_FILE = "opening_book.bin"
+MAGIC = b"ATXBOOK2"
+
+# key, move (src << 8 | target), score, depth, check
+RECORD = struct.Struct("<QHhHI")
+KEY = struct.Struct("<Q")
+
+# Cells of the largest board a move code can address
+MAX_CELLS = 256
+
+
+def supports(position):
+    return position.rows * position.cols <= MAX_CELLS
+
+
+def encode_move(position, move, transform):
+    # The move as played in the position, turned into canonical orientation
+    if not supports(position):
+        raise ValueError(f"Boards of more than {MAX_CELLS} cells can't be booked")
+    perm = get_symmetry_keys(position.rows, position.cols, position.blocked).perms[transform]
+    src = move[0] * position.cols + move[1]
+    target = move[2] * position.cols + move[3]
+    return perm[src] << 8 | perm[target]
+
+
+def position_check(position, transform):
+    # CRC of the board size, the blocked cells and both sides' pieces in
+    # canonical orientation, from the side to move's point of view
+    perm = get_symmetry_keys(position.rows, position.cols, position.blocked).perms[transform]
+    size = (position.rows * position.cols + 7) // 8
+    player = position.active_player
+    data = bytes((position.rows, position.cols))
+    for mask in (position.blocked, position.pieces[player], position.pieces[3 - player]):
+        data += transform_mask(mask, perm).to_bytes(size, "little")
+    return zlib.crc32(data)
+
+
+def decode_move(position, code, transform):
+    inverse = get_symmetry_keys(position.rows, position.cols, position.blocked).inverses[transform]
+    src, target = code >> 8, code & 0xFF
+    if src >= len(inverse) or target >= len(inverse):
+        return None
+    return position.find_move(inverse[src], inverse[target])
+
+
+def read_entries(path=BOOK_FILE):
+    # Every record of a book file as {key: (move code, score, depth, check)},
+    # used when a book is extended. Returns an empty dict if there is no book yet.
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return {}
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an opening book")
+    return {key: record for key, *record in RECORD.iter_unpack(data[len(MAGIC):])}
+
+
+def write_book(entries, path=BOOK_FILE):
+    # Written next to the old book and moved over it, so a game that has the old
+    # one mapped keeps reading a complete file
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(MAGIC)
+        for key in sorted(entries):
+            file.write(RECORD.pack(key, *entries[key]))
+    os.replace(temporary, path)
+
+
+class OpeningBook:
+    def __init__(self, path=BOOK_FILE):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self.map[:len(MAGIC)] != MAGIC or (size - len(MAGIC)) % RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.count = (size - len(MAGIC)) // RECORD.size
+
+    @classmethod
+    def open(cls, path=BOOK_FILE):
+        # The book is optional: returns None if there is none (or it is broken)
+        try:
+            return cls(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not open opening book {path}: {e}")
+            return None
+
+    def __len__(self):
+        return self.count
+
+    def find(self, key):
+        # Returns (move code, score, depth, check) for the key, or None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = len(MAGIC) + middle * RECORD.size
+            found = KEY.unpack_from(self.map, offset)[0]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return RECORD.unpack_from(self.map, offset)[1:]
+        return None
+
+    def probe(self, position):
+        # The book move for the side to move, or None if the position isn't in
+        # the book
+        if not supports(position):
+            return None
+        key, transform = position.canonical_hash()
+        entry = self.find(key)
+        if entry is None or entry[3] != position_check(position, transform):
+            return None
+        return decode_move(position, entry[0], transform)
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
@@ -0,0 +1,103 @@
+"""A chess clock for timed games.
+
+Each player's time is kept in seconds and measured with a monotonic clock, so it
+doesn't matter how often or how regularly the clock is looked at: a slow frame
+or a busy main loop only delays the display, never what a player is charged.
+
+The clock runs for one player at a time. The owner gives a player the Fischer
+increment for every move they complete; switching alone (after a pass, or to
+show whose turn it is) earns nothing. It can be paused, during animations and
+popups, without charging anyone. Pauses nest, so the clock only runs again
+once every pause has been resumed. snapshot() and restore() save and bring back
+both players' time, so taking a move back also takes back its time.
+
+The clock has no timer of its own. The owner calls update() whenever it likes,
+and schedules one call for when deadline() says the running player's time runs
+out; update() calls on_flag once with the player whose time is up.
+"""
+
+import time
+
+
+class ChessClock:
+    def __init__(self, initial, increment=0.0, on_flag=None, now=time.monotonic):
+        self.remaining = {1: float(initial), 2: float(initial)}
+        self.increment = increment
+        self.on_flag = on_flag
+        self.now = now
+        # The player whose time runs, and since when (None while paused)
+        self.active = None
+        self.started = None
+        self.pauses = 0
+        self.flagged = None
+
+    @property
+    def running(self):
+        return self.started is not None
+
+    def time_left(self, player):
+        left = self.remaining[player]
+        if player == self.active and self.started is not None:
+            left -= self.now() - self.started
+        return max(0.0, left)
+
+    def charge(self):
+        # Takes the time since the last charge off the running player
+        if self.started is not None:
+            now = self.now()
+            self.remaining[self.active] -= now - self.started
+            self.started = now
+
+    def switch(self, player):
+        # Starts the clock of player
+        if player == self.active or self.flagged is not None:
+            return
+        self.charge()
+        self.active = player
+        self.started = None if self.pauses else self.now()
+
+    def add_increment(self, player):
+        if self.flagged is None:
+            self.remaining[player] += self.increment
+
+    def snapshot(self):
+        # Both players' time left, for restore()
+        return {player: self.time_left(player) for player in self.remaining}
+
+    def restore(self, snapshot):
+        self.charge()
+        self.remaining = dict(snapshot)
+        if self.started is not None:
+            self.started = self.now()
+
+    def pause(self):
+        self.charge()
+        self.pauses += 1
+        self.started = None
+
+    def resume(self):
+        self.pauses = max(0, self.pauses - 1)
+        if not self.pauses and self.active is not None and self.started is None:
+            self.started = self.now()
+
+    def stop(self):
+        self.charge()
+        self.active = None
+        self.started = None
+
+    def deadline(self):
+        # Seconds until the running player's time runs out, None while paused
+        if self.started is None:
+            return None
+        return self.time_left(self.active)
+
+    def update(self):
+        # Calls on_flag if the running player's time is up; returns that player or None
+        if self.started is None or self.time_left(self.active) > 0:
+            return None
+        player = self.active
+        self.stop()
+        self.flagged = player
+        if self.on_flag is not None:
+            self.on_flag(player)
+        return player
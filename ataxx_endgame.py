@@ -0,0 +1,119 @@
+"""Exact endgame solver for Ataxx.
+
+Once only a few cells are left empty the game can be searched to the very end.
+The solver plays every line out until the game is over and scores it by the
+final piece count, so its result is the exact outcome with best play, not an
+estimate.
+
+Jumps don't fill a cell, so a game can in principle go on for ever, and the
+search needs a ply horizon. Lines still going at the horizon are scored as lost
+for one side, and the position is searched twice, once against each side. The
+first search gives the final score the side to move can force, the second the
+score the opponent can hold it to; when they agree the result is exact, and a
+forced win is found even when they don't. The horizon is widened until that
+happens or time runs out.
+
+Every result is a true bound on the final score whatever horizon it came from,
+so the solver's cache stays valid from one move to the next.
+"""
+
+import random
+import time
+
+from ataxx_search import WIN_SCORE, AlphaBetaSearch, SearchResult, SearchTimeout, terminal_score
+
+# Solve positions with at most this many empty cells by default
+ENDGAME_EMPTIES = 6
+
+# Score of a line that is still going at the horizon, for the side it counts
+# against. It is beyond any real final score.
+UNRESOLVED = 2 * WIN_SCORE
+
+
+class EndgameResult(SearchResult):
+    def __init__(self, move, score, depth, nodes, elapsed, exact):
+        super().__init__(move, score, depth, nodes, elapsed)
+        self.exact = exact
+
+    @property
+    def margin(self):
+        # Final piece difference the side to move can force, None if not proven
+        if abs(self.score) >= UNRESOLVED:
+            return None
+        if self.score > WIN_SCORE // 2:
+            return self.score - WIN_SCORE
+        if self.score < -WIN_SCORE // 2:
+            return self.score + WIN_SCORE
+        return self.score
+
+    def __repr__(self):
+        return (f"EndgameResult(move={self.move}, margin={self.margin}, exact={self.exact}, "
+                f"horizon={self.depth}, nodes={self.nodes}, nps={self.nps:.0f})")
+
+
+class EndgameSolver(AlphaBetaSearch):
+    def __init__(self, empties=ENDGAME_EMPTIES, time_limit=1.0, max_plies=64, cache_mb=8):
+        super().__init__(time_limit=time_limit, max_depth=max_plies, tt_size_mb=cache_mb, symmetry=False)
+        self.empties = empties
+        # The side that lines cut off at the horizon count for in the current search
+        self.favoured = None
+        # Results of the two searches are cached under different keys
+        rng = random.Random(ENDGAME_EMPTIES)
+        self.favour_keys = [0, rng.getrandbits(64), rng.getrandbits(64)]
+
+    def applies_to(self, position):
+        return position.empty_count() <= self.empties
+
+    def search(self, position, time_limit=None, max_depth=None, stop_event=None):
+        if time_limit is None:
+            time_limit = self.time_limit
+        if max_depth is None:
+            max_depth = self.max_depth
+
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit else None
+        self.stop_event = stop_event
+        self.nodes = 0
+        self.tt.new_search()
+
+        root_moves = self.order_moves(position, position.legal_moves())
+        if not root_moves:
+            return EndgameResult(None, 0, 0, 0, time.perf_counter() - start, True)
+
+        player = position.active_player
+        root_ply = len(position.history)
+        best_move, lower, upper, horizon = root_moves[0], -UNRESOLVED, UNRESOLVED, 0
+        # Every line takes at least as many plies as there are empty cells to fill
+        for plies in range(max(1, position.empty_count()), max_depth + 1):
+            if horizon and self.should_stop():
+                break
+            try:
+                self.favoured = 3 - player
+                self.root_best = None
+                pass_lower, pass_move = self.search_root(position, root_moves, plies)
+                self.favoured = player
+                self.root_best = None
+                pass_upper, hopeful_move = self.search_root(position, root_moves, plies)
+            except SearchTimeout:
+                while len(position.history) > root_ply:
+                    position.unmake_move()
+                break
+            horizon = plies
+            lower, upper = pass_lower, pass_upper
+            # Without a proven result, play the move that keeps the best chances
+            best_move = pass_move if lower > -UNRESOLVED else hopeful_move
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            if lower == upper:
+                break
+
+        return EndgameResult(best_move, lower, horizon, self.nodes, time.perf_counter() - start, lower == upper)
+
+    def tt_key(self, position):
+        return position.hash ^ self.favour_keys[self.favoured], None
+
+    def evaluate(self, position):
+        # Only reached at the horizon
+        if position.is_game_over():
+            return terminal_score(position)
+        return UNRESOLVED if position.active_player == self.favoured else -UNRESOLVED
@@ -0,0 +1,452 @@
+"""Headless Ataxx rules engine.
+
+The position uses the same board format as levels.txt: a list of rows where 0 is
+an empty cell, 1 and 2 are the players' pieces and 9 is a blocked cell. Nothing
+in here imports Kivy, so the game rules can be simulated without opening a window.
+
+Internally the position is a set of bitboards: one integer mask per player and
+one for the blocked cells, with bit (row * cols + col) standing for a cell. The
+clone and jump neighbourhoods of every cell are precomputed once per board size,
+so generating moves, flipping captures and checking mobility are all a few mask
+operations instead of walks over the board.
+
+The piece and empty cell counts are kept up to date as moves are made and taken
+back, and whether a player can still move is answered by growing their pieces by
+two cells with a fixed number of shifts, so the end of the game is detected
+without scanning the board.
+
+Every position also carries a 64-bit Zobrist hash (pieces, blocked cells and the
+side to move) that is updated incrementally as moves and captures are applied.
+After track_symmetry() it also keeps one hash per board symmetry, so the hash of
+the canonical form (see ataxx_symmetry) is available without turning the board.
+
+Moves are (src_row, src_col, target_row, target_col) tuples, the same format the
+GameScreen and AtaxxAI have always used. A pass is represented by None.
+"""
+
+import json
+import random
+
+from ataxx_symmetry import get_symmetry_keys
+
+EMPTY = 0
+PLAYER_1 = 1
+PLAYER_2 = 2
+BLOCKED = 9
+
+CLONE_DIRECTIONS = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+]
+
+# Every cell at a distance of exactly two (the whole outer ring, not just the
+# straight and diagonal lines) is a valid jump target in Ataxx.
+JUMP_DIRECTIONS = [
+    (d_row, d_col)
+    for d_row in range(-2, 3)
+    for d_col in range(-2, 3)
+    if max(abs(d_row), abs(d_col)) == 2
+]
+
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    # int.bit_count only exists from Python 3.10 onwards
+    def popcount(mask):
+        return bin(mask).count("1")
+
+
+def opponent_of(player):
+    return PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+
+def move_distance(move):
+    src_row, src_col, target_row, target_col = move
+    return max(abs(src_row - target_row), abs(src_col - target_col))
+
+
+def load_levels(path="levels.txt"):
+    # Levels drawn by hand in levels.txt are stored top row first, while the board
+    # is drawn bottom row first, so those get flipped. Levels saved by the level
+    # editor are already stored in board order and are marked as "generated".
+    with open(path, "r") as file:
+        levels = json.load(file)
+    for level in levels:
+        if not level.get("generated", False):
+            level["board"] = level["board"][::-1]
+    return levels
+
+
+class BoardGeometry:
+    # Everything about a board size that never changes during a game. These are
+    # shared between all positions of the same size through get_geometry.
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+        self.coords = [divmod(square, cols) for square in range(self.size)]
+        self.clone_masks = [self._ring_mask(square, CLONE_DIRECTIONS) for square in range(self.size)]
+        self.jump_masks = [self._ring_mask(square, JUMP_DIRECTIONS) for square in range(self.size)]
+        self.move_masks = [clone | jump for clone, jump in zip(self.clone_masks, self.jump_masks)]
+
+        # Shifting a mask one column over wraps cells around into the next row, so
+        # the wrapped column is masked off afterwards
+        first_col = sum(1 << (row * cols) for row in range(rows))
+        self.not_first_col = self.full_mask & ~first_col
+        self.not_last_col = self.full_mask & ~(first_col << (cols - 1))
+
+        # The Zobrist keys are seeded from the board size, so the same position
+        # hashes to the same value in every run (the opening book relies on this)
+        rng = random.Random(rows * 1000 + cols)
+        self.zobrist = [
+            [0] * self.size,
+            [rng.getrandbits(64) for _ in range(self.size)],
+            [rng.getrandbits(64) for _ in range(self.size)],
+        ]
+        self.zobrist_blocked = [rng.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_side = rng.getrandbits(64)
+        self.zobrist_flip = [key_1 ^ key_2 for key_1, key_2 in zip(self.zobrist[1], self.zobrist[2])]
+
+    def _ring_mask(self, square, directions):
+        row, col = self.coords[square]
+        mask = 0
+        for d_row, d_col in directions:
+            target_row, target_col = row + d_row, col + d_col
+            if 0 <= target_row < self.rows and 0 <= target_col < self.cols:
+                mask |= 1 << (target_row * self.cols + target_col)
+        return mask
+
+    def square(self, row, col):
+        return row * self.cols + col
+
+    def grow(self, mask):
+        # Every cell within a distance of one of the cells in mask (a 3x3 box
+        # around each of them), using a constant number of shifts
+        mask |= ((mask << 1) & self.not_first_col) | ((mask >> 1) & self.not_last_col)
+        return (mask | (mask << self.cols) | (mask >> self.cols)) & self.full_mask
+
+    def hash_position(self, pieces, blocked, active_player):
+        key = self.zobrist_side if active_player == PLAYER_2 else 0
+        for keys, mask in ((self.zobrist[PLAYER_1], pieces[PLAYER_1]), (self.zobrist[PLAYER_2], pieces[PLAYER_2]),
+                           (self.zobrist_blocked, blocked)):
+            while mask:
+                low = mask & -mask
+                key ^= keys[low.bit_length() - 1]
+                mask ^= low
+        return key
+
+    def cells_of(self, mask):
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(self.coords[low.bit_length() - 1])
+            mask ^= low
+        return cells
+
+
+_geometries = {}
+
+
+def get_geometry(rows, cols):
+    geometry = _geometries.get((rows, cols))
+    if geometry is None:
+        geometry = _geometries[(rows, cols)] = BoardGeometry(rows, cols)
+    return geometry
+
+
+class AtaxxPosition:
+    def __init__(self, board, active_player=PLAYER_1):
+        self.rows = len(board)
+        self.cols = len(board[0]) if board else 0
+        self.geometry = get_geometry(self.rows, self.cols)
+        # pieces[1] and pieces[2] are the players' bitboards, pieces[0] is unused
+        self.pieces = [0, 0, 0]
+        self.blocked = 0
+        for row_idx, row in enumerate(board):
+            for col_idx, cell_value in enumerate(row):
+                bit = 1 << (row_idx * self.cols + col_idx)
+                if cell_value == BLOCKED:
+                    self.blocked |= bit
+                elif cell_value in (PLAYER_1, PLAYER_2):
+                    self.pieces[cell_value] |= bit
+        self.active_player = active_player
+        self.hash = self.geometry.hash_position(self.pieces, self.blocked, active_player)
+        # counts[0] is the number of empty cells, counts[1] and counts[2] the pieces
+        self.counts = [popcount(self.empty_mask()), popcount(self.pieces[PLAYER_1]), popcount(self.pieces[PLAYER_2])]
+        # Every make_move/make_pass pushes an entry here so it can be undone
+        self.history = []
+        # Set by track_symmetry
+        self.symmetry = None
+        self.symmetry_hashes = None
+
+    @classmethod
+    def from_level(cls, level, active_player=PLAYER_1):
+        return cls(level["board"], active_player)
+
+    def copy(self):
+        position = AtaxxPosition.__new__(AtaxxPosition)
+        position.rows = self.rows
+        position.cols = self.cols
+        position.geometry = self.geometry
+        position.pieces = list(self.pieces)
+        position.blocked = self.blocked
+        position.active_player = self.active_player
+        position.hash = self.hash
+        position.counts = list(self.counts)
+        position.history = list(self.history)
+        position.symmetry = self.symmetry
+        position.symmetry_hashes = self.symmetry_hashes
+        return position
+
+    def track_symmetry(self):
+        # Keeps the symmetric hashes up to date from now on, which makes moves a
+        # little slower and canonical_hash much faster
+        self.symmetry = get_symmetry_keys(self.rows, self.cols, self.blocked)
+        self.symmetry_hashes = self.symmetry.hash_all(self.pieces)
+
+    def canonical_hash(self):
+        # Returns (hash, transform): the hash shared by every position equivalent
+        # to this one under the board's symmetries and colour swap, and the index
+        # of the transform in symmetry.perms that turns this position into the
+        # canonical one
+        if self.symmetry_hashes is not None:
+            return self.symmetry.canonical(self.symmetry_hashes, self.active_player)
+        symmetry = get_symmetry_keys(self.rows, self.cols, self.blocked)
+        return symmetry.canonical(symmetry.hash_all(self.pieces), self.active_player)
+
+    @property
+    def board(self):
+        # The list of rows format used by levels.txt and the neural network
+        board = [[EMPTY] * self.cols for _ in range(self.rows)]
+        for value, mask in ((PLAYER_1, self.pieces[PLAYER_1]), (PLAYER_2, self.pieces[PLAYER_2]),
+                            (BLOCKED, self.blocked)):
+            for row, col in self.geometry.cells_of(mask):
+                board[row][col] = value
+        return board
+
+    def fen(self):
+        # Position string in the usual Ataxx FEN style: rows from the top of the
+        # screen down, x for player 1, o for player 2, - for blocked cells, digits
+        # for runs of empty cells, then the side to move
+        symbols = {EMPTY: "", PLAYER_1: "x", PLAYER_2: "o", BLOCKED: "-"}
+        fen_rows = []
+        for row in reversed(self.board):
+            text = ""
+            empty_run = 0
+            for cell_value in row:
+                if cell_value == EMPTY:
+                    empty_run += 1
+                    continue
+                if empty_run:
+                    text += str(empty_run)
+                    empty_run = 0
+                text += symbols[cell_value]
+            if empty_run:
+                text += str(empty_run)
+            fen_rows.append(text)
+        return "/".join(fen_rows) + (" x" if self.active_player == PLAYER_1 else " o")
+
+    def empty_mask(self):
+        return self.geometry.full_mask & ~(self.pieces[PLAYER_1] | self.pieces[PLAYER_2] | self.blocked)
+
+    def cell(self, row, col):
+        bit = 1 << (row * self.cols + col)
+        if self.pieces[PLAYER_1] & bit:
+            return PLAYER_1
+        if self.pieces[PLAYER_2] & bit:
+            return PLAYER_2
+        if self.blocked & bit:
+            return BLOCKED
+        return EMPTY
+
+    def cells_of(self, mask):
+        return self.geometry.cells_of(mask)
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def legal_moves(self, player=None):
+        # Cloning into a cell gives the same position no matter which neighbouring
+        # piece it grows from, so only one clone move is listed per target cell.
+        if player is None:
+            player = self.active_player
+        geometry = self.geometry
+        coords = geometry.coords
+        clone_masks = geometry.clone_masks
+        jump_masks = geometry.jump_masks
+        own = self.pieces[player]
+        empty = self.empty_mask()
+        moves = []
+
+        clone_targets = geometry.grow(own) & empty
+        while clone_targets:
+            low = clone_targets & -clone_targets
+            target = low.bit_length() - 1
+            sources = clone_masks[target] & own
+            moves.append(coords[(sources & -sources).bit_length() - 1] + coords[target])
+            clone_targets ^= low
+
+        pieces = own
+        while pieces:
+            low = pieces & -pieces
+            src = low.bit_length() - 1
+            targets = jump_masks[src] & empty
+            while targets:
+                target_bit = targets & -targets
+                moves.append(coords[src] + coords[target_bit.bit_length() - 1])
+                targets ^= target_bit
+            pieces ^= low
+        return moves
+
+    def reach_mask(self, player):
+        # Every cell within a distance of two of one of the player's pieces
+        geometry = self.geometry
+        return geometry.grow(geometry.grow(self.pieces[player]))
+
+    def mobility(self, player=None):
+        # Number of different empty cells the player can move a piece into
+        if player is None:
+            player = self.active_player
+        return popcount(self.reach_mask(player) & self.empty_mask())
+
+    def has_valid_moves(self, player=None):
+        if player is None:
+            player = self.active_player
+        if not self.counts[EMPTY] or not self.counts[player]:
+            return False
+        return bool(self.reach_mask(player) & self.empty_mask())
+
+    def is_legal(self, move):
+        src_row, src_col, target_row, target_col = move
+        if not self.in_bounds(src_row, src_col) or not self.in_bounds(target_row, target_col):
+            return False
+        src = 1 << (src_row * self.cols + src_col)
+        target = target_row * self.cols + target_col
+        return (bool(self.pieces[self.active_player] & src)
+                and bool(self.empty_mask() >> target & 1)
+                and bool(self.geometry.move_masks[target] & src))
+
+    def find_move(self, src, target, moves=None):
+        # The legal move from square src to square target, or None. A clone is
+        # matched on its target alone, since legal_moves lists one per target
+        # cell and the source it names may be a different neighbouring piece.
+        if moves is None:
+            moves = self.legal_moves()
+        coords = self.geometry.coords
+        if not 0 <= src < self.geometry.size or not 0 <= target < self.geometry.size:
+            return None
+        move = coords[src] + coords[target]
+        if move in moves:
+            return move
+        if move_distance(move) == 1:
+            return next((m for m in moves if m[2:] == move[2:] and move_distance(m) == 1), None)
+        return None
+
+    def make_move(self, move):
+        # Applies the move for the side to move and returns the bitmask of captured
+        # cells (cells_of turns it into a list of (row, col) pairs)
+        if move is None:
+            return self.make_pass()
+        player = self.active_player
+        opponent = 3 - player
+        cols = self.cols
+        src = move[0] * cols + move[1]
+        target = move[2] * cols + move[3]
+        pieces = self.pieces
+        geometry = self.geometry
+        keys = geometry.zobrist[player]
+
+        captured = geometry.clone_masks[target] & pieces[opponent]
+        captured_count = popcount(captured)
+        own = pieces[player] | (1 << target) | captured
+        key = self.hash ^ geometry.zobrist_side ^ keys[target]
+        is_jump = not geometry.clone_masks[src] >> target & 1
+        counts = self.counts
+        if is_jump:
+            own ^= 1 << src
+            key ^= keys[src]
+        else:
+            counts[EMPTY] -= 1
+            counts[player] += 1
+        counts[player] += captured_count
+        counts[opponent] -= captured_count
+        pieces[player] = own
+        pieces[opponent] ^= captured
+
+        flip_keys = geometry.zobrist_flip
+        flipped = captured
+        while flipped:
+            low = flipped & -flipped
+            key ^= flip_keys[low.bit_length() - 1]
+            flipped ^= low
+
+        symmetry_hashes = self.symmetry_hashes
+        if symmetry_hashes is not None:
+            self.symmetry_hashes = self.symmetry.update(symmetry_hashes, player, src, target, is_jump, captured)
+
+        self.history.append((move, src, target, is_jump, captured, captured_count, self.hash, symmetry_hashes))
+        self.hash = key
+        self.active_player = opponent
+        return captured
+
+    def make_pass(self):
+        self.history.append((None, 0, 0, False, 0, 0, self.hash, self.symmetry_hashes))
+        self.hash ^= self.geometry.zobrist_side
+        self.active_player = opponent_of(self.active_player)
+        return 0
+
+    def unmake_move(self):
+        move, src, target, is_jump, captured, captured_count, previous_hash, symmetry_hashes = self.history.pop()
+        opponent = self.active_player
+        player = self.active_player = 3 - opponent
+        self.hash = previous_hash
+        self.symmetry_hashes = symmetry_hashes
+        if move is None:
+            return move
+        pieces = self.pieces
+        counts = self.counts
+        own = (pieces[player] ^ captured) & ~(1 << target)
+        if is_jump:
+            own |= 1 << src
+        else:
+            counts[EMPTY] += 1
+            counts[player] -= 1
+        counts[player] -= captured_count
+        counts[opponent] += captured_count
+        pieces[player] = own
+        pieces[opponent] |= captured
+        return move
+
+    def piece_count(self, player):
+        return self.counts[player]
+
+    def empty_count(self):
+        return self.counts[EMPTY]
+
+    def score(self, player=None):
+        # Piece difference from the point of view of the given player
+        if player is None:
+            player = self.active_player
+        return self.counts[player] - self.counts[3 - player]
+
+    def is_game_over(self):
+        counts = self.counts
+        if not counts[PLAYER_1] or not counts[PLAYER_2] or not counts[EMPTY]:
+            return True
+        return not self.has_valid_moves(self.active_player) and not self.has_valid_moves(3 - self.active_player)
+
+    def winner(self):
+        # Returns 1 or 2 for the winning player, 0 for a draw and None while the
+        # game is still going
+        if not self.is_game_over():
+            return None
+        player_1_count = self.counts[PLAYER_1]
+        player_2_count = self.counts[PLAYER_2]
+        if player_1_count > player_2_count:
+            return PLAYER_1
+        if player_2_count > player_1_count:
+            return PLAYER_2
+        return 0
@@ -0,0 +1,143 @@
+"""Evaluation functions for the Ataxx searches.
+
+An evaluator scores a position from the side to move's point of view; the
+alpha-beta search calls evaluator.evaluate(position) at its leaves. There are two:
+
+    MaterialEvaluator  the piece difference, which is what the search used to use
+    FeatureEvaluator   a weighted sum of the features below
+
+Every feature is the side to move's value minus the opponent's:
+
+    material   pieces on the board
+    mobility   empty cells the player can move a piece into
+    frontier   pieces next to an empty cell, which the other side can capture
+    exposed    empty cells next to the player's pieces that the other side can reach
+    anchored   pieces next to a blocked cell
+    parity     1 if the side to move gets to fill the last empty cell when every
+               move is a clone, -1 if not (not a difference)
+
+position_features works on one position with bitboard operations and is what the
+search uses. board_features computes the same features with NumPy for a whole
+batch of boards at once, which is what tune_eval.py fits the weights on;
+tune_eval.py checks that the two agree on every position it fits on. Tuned
+weights are read from eval_weights.json when it exists.
+"""
+
+import json
+
+import numpy as np
+
+from ataxx_engine import BLOCKED, EMPTY, popcount
+
+FEATURES = ("material", "mobility", "frontier", "exposed", "anchored", "parity")
+
+WEIGHTS_FILE = "eval_weights.json"
+
+# Hand-picked weights, in pieces, used until tune_eval.py has written better ones
+DEFAULT_WEIGHTS = {
+    "material": 1.0,
+    "mobility": 0.1,
+    "frontier": -0.2,
+    "exposed": -0.3,
+    "anchored": 0.1,
+    "parity": 0.5,
+}
+
+# Evaluations are whole numbers, so the weighted sum is scaled to keep fractions
+# of a piece apart. One piece is worth EVAL_SCALE.
+EVAL_SCALE = 10
+
+
+def load_weights(path=WEIGHTS_FILE):
+    # The tuned weights, or the default ones if there are none (or they are broken)
+    try:
+        with open(path, "r") as file:
+            weights = json.load(file)
+    except FileNotFoundError:
+        return dict(DEFAULT_WEIGHTS)
+    except (OSError, ValueError) as e:
+        print(f"Could not load evaluation weights {path}: {e}")
+        return dict(DEFAULT_WEIGHTS)
+    return {feature: float(weights.get(feature, DEFAULT_WEIGHTS[feature])) for feature in FEATURES}
+
+
+def save_weights(weights, path=WEIGHTS_FILE):
+    with open(path, "w") as file:
+        json.dump({feature: round(float(weights[feature]), 4) for feature in FEATURES}, file, indent=4)
+
+
+def position_features(position):
+    # The features of a single position as a tuple in FEATURES order
+    grow = position.geometry.grow
+    player = position.active_player
+    own, other = position.pieces[player], position.pieces[3 - player]
+    empty = position.empty_mask()
+    near_empty = grow(empty)
+    near_blocked = grow(position.blocked) if position.blocked else 0
+    near_own, near_other = grow(own), grow(other)
+    reach_own, reach_other = grow(near_own), grow(near_other)
+
+    parity = 1 if position.counts[EMPTY] % 2 else -1
+    return (
+        position.counts[player] - position.counts[3 - player],
+        popcount(reach_own & empty) - popcount(reach_other & empty),
+        popcount(own & near_empty) - popcount(other & near_empty),
+        popcount(empty & near_own & reach_other) - popcount(empty & near_other & reach_own),
+        popcount(own & near_blocked) - popcount(other & near_blocked),
+        parity,
+    )
+
+
+def _grow_boards(masks, radius):
+    # Every cell within the given distance of a cell in each (n, rows, cols) mask
+    rows, cols = masks.shape[1:]
+    padded = np.pad(masks, ((0, 0), (radius, radius), (radius, radius)))
+    grown = np.zeros_like(masks)
+    for d_row in range(2 * radius + 1):
+        for d_col in range(2 * radius + 1):
+            grown |= padded[:, d_row:d_row + rows, d_col:d_col + cols]
+    return grown
+
+
+def board_features(boards, players):
+    # The features of a batch of positions: boards is an (n, rows, cols) array in
+    # the list of rows format and players the side to move of each. Returns an
+    # (n, len(FEATURES)) array.
+    boards = np.asarray(boards)
+    players = np.asarray(players).reshape(-1, 1, 1)
+    empty = boards == EMPTY
+    near_empty = _grow_boards(empty, 1)
+    near_blocked = _grow_boards(boards == BLOCKED, 1)
+
+    values = []
+    for own, other in ((boards == players, boards == 3 - players), (boards == 3 - players, boards == players)):
+        near_own = _grow_boards(own, 1)
+        other_reach = _grow_boards(other, 2)
+        values.append(np.stack([
+            own.sum(axis=(1, 2)),
+            (_grow_boards(own, 2) & empty).sum(axis=(1, 2)),
+            (own & near_empty).sum(axis=(1, 2)),
+            (empty & near_own & other_reach).sum(axis=(1, 2)),
+            (own & near_blocked).sum(axis=(1, 2)),
+        ], axis=1))
+    parity = np.where(empty.sum(axis=(1, 2)) % 2 == 1, 1, -1)
+    return np.column_stack([values[0] - values[1], parity])
+
+
+class MaterialEvaluator:
+    def evaluate(self, position):
+        return position.score()
+
+
+class FeatureEvaluator:
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = load_weights()
+        self.weights = weights
+        self.scaled = [weights[feature] * EVAL_SCALE for feature in FEATURES]
+
+    def evaluate(self, position):
+        return round(sum(weight * value for weight, value in zip(self.scaled, position_features(position))))
+
+    def evaluate_batch(self, boards, players):
+        return np.rint(board_features(boards, players) @ np.array(self.scaled)).astype(int)
@@ -0,0 +1,236 @@
+"""Monte Carlo Tree Search opponent for Ataxx.
+
+A UCT search with random playouts on the headless AtaxxPosition. To make use of
+several cores, the search is root-parallel: each worker process grows its own
+tree from the current position with a share of the playout budget, and the
+visit and win counts of the root moves are added together to pick the move.
+
+Forking a process that already runs other threads (the game's background search,
+Kivy's window, audio and GL state) is unsafe, as a lock held by another thread
+stays locked in the child forever. The game therefore starts a shared pool of
+worker processes with start_workers() before Kivy is even imported, so the
+workers are forked from a process that holds nothing but the headless engine.
+A search without that pool starts its own workers with the spawn start method.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from ataxx_engine import AtaxxPosition
+
+# Random playouts are cut off after this many plies and scored by piece count
+MAX_PLAYOUT_PLIES = 80
+
+# Worker processes a search uses by default. Root parallelism gains little from
+# more trees, and the game keeps this many processes up from the start.
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 4)
+
+# The worker processes shared by every search and how many there are, see start_workers()
+worker_pool = None
+pool_size = 0
+
+
+def start_workers(workers=None):
+    # Must be called while the process has no other threads, e.g. first thing in
+    # a script. Where forking isn't available the pool is left to the searches.
+    global worker_pool, pool_size
+    if worker_pool is None and "fork" in multiprocessing.get_all_start_methods():
+        workers = workers or DEFAULT_WORKERS
+        pool_size = workers
+        worker_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        # A fork pool starts all of its processes with the first task, so they are
+        # started now rather than from whichever thread searches first
+        wait([worker_pool.submit(int) for _ in range(workers)])
+    return worker_pool
+
+
+class MCTSNode:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "player")
+
+    def __init__(self, move, parent, position):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+        # The player that made the move leading to this node, whose point of view
+        # the win count is kept from
+        self.player = 3 - position.active_player
+        if not position.pieces[1] or not position.pieces[2]:
+            self.untried = []
+        else:
+            self.untried = position.legal_moves()
+            if not self.untried and position.has_valid_moves(3 - position.active_player):
+                self.untried = [None]
+
+    def select_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def update(self, winner):
+        self.visits += 1
+        if winner == self.player:
+            self.wins += 1.0
+        elif winner == 0:
+            self.wins += 0.5
+
+
+class MCTSResult:
+    def __init__(self, move, win_rate, playouts, elapsed):
+        self.move = move
+        self.win_rate = win_rate
+        self.playouts = playouts
+        self.elapsed = elapsed
+
+    @property
+    def playouts_per_second(self):
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"MCTSResult(move={self.move}, win_rate={self.win_rate:.2f}, playouts={self.playouts}, "
+                f"playouts/s={self.playouts_per_second:.0f})")
+
+
+def playout(position, rng, max_plies=MAX_PLAYOUT_PLIES):
+    # Plays random moves from the position and returns the winner (0 for a draw)
+    pieces = position.pieces
+    for _ in range(max_plies):
+        if not pieces[1] or not pieces[2]:
+            break
+        moves = position.legal_moves()
+        if moves:
+            position.make_move(moves[rng.randrange(len(moves))])
+        elif position.has_valid_moves(3 - position.active_player):
+            position.make_pass()
+        else:
+            break
+    player_1_count = position.piece_count(1)
+    player_2_count = position.piece_count(2)
+    if player_1_count > player_2_count:
+        return 1
+    if player_2_count > player_1_count:
+        return 2
+    return 0
+
+
+def grow_tree(board, active_player, playouts, exploration, time_limit=None, seed=None, stop_event=None):
+    # Runs one UCT tree and returns ({move: (visits, wins)}, playouts done). This
+    # is what every worker process runs, so it only takes plain picklable values
+    # (stop_event is only passed when the tree is grown in this process).
+    rng = random.Random(seed)
+    position = AtaxxPosition(board, active_player)
+    root = MCTSNode(None, None, position)
+    deadline = time.perf_counter() + time_limit if time_limit else None
+
+    done = 0
+    while done < playouts:
+        if done % 16 == 0:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            position.make_move(node.move)
+
+        if node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            position.make_move(move)
+            child = MCTSNode(move, node, position)
+            node.children.append(child)
+            node = child
+
+        winner = playout(position, rng)
+        while node is not None:
+            node.update(winner)
+            node = node.parent
+        while position.history:
+            position.unmake_move()
+        done += 1
+
+    return {child.move: (child.visits, child.wins) for child in root.children}, done
+
+
+class MCTSSearch:
+    def __init__(self, playouts=4000, exploration=1.4, workers=None, time_limit=None):
+        self.playouts = playouts
+        self.exploration = exploration
+        self.workers = workers or DEFAULT_WORKERS
+        self.time_limit = time_limit
+        self.executor = None
+        self.last_result = None
+
+    def get_action(self, position, stop_event=None, time_limit=None):
+        # time_limit overrides the search's own limit for this move only
+        self.last_result = self.search(position, time_limit=time_limit, stop_event=stop_event)
+        return self.last_result.move
+
+    def get_executor(self):
+        # The shared pool only fits searches that don't need more processes than it has
+        if worker_pool is not None and self.workers <= pool_size:
+            return worker_pool
+        if self.executor is None:
+            # This can run on a background thread, so the workers are never forked here
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def search(self, position, playouts=None, time_limit=None, stop_event=None):
+        if playouts is None:
+            playouts = self.playouts
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        start = time.perf_counter()
+        moves = position.legal_moves()
+        if len(moves) <= 1:
+            return MCTSResult(moves[0] if moves else None, 0.0, 0, time.perf_counter() - start)
+
+        board = position.board
+        share = max(1, playouts // self.workers)
+        if self.workers == 1:
+            results = [grow_tree(board, position.active_player, share, self.exploration, time_limit,
+                                 stop_event=stop_event)]
+        else:
+            executor = self.get_executor()
+            seeds = [random.getrandbits(32) for _ in range(self.workers)]
+            futures = [executor.submit(grow_tree, board, position.active_player, share, self.exploration,
+                                       time_limit, seed)
+                       for seed in seeds]
+            # The worker processes can't see the stop event, so it is watched here
+            # while waiting and whatever has finished by then is used
+            pending = futures
+            while pending:
+                if stop_event is not None and stop_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    break
+                _, pending = wait(pending, timeout=0.05)
+            results = [future.result() for future in futures if future.done() and not future.cancelled()]
+
+        visits = {}
+        wins = {}
+        total = 0
+        for root_stats, done in results:
+            total += done
+            for move, (move_visits, move_wins) in root_stats.items():
+                visits[move] = visits.get(move, 0) + move_visits
+                wins[move] = wins.get(move, 0.0) + move_wins
+
+        if not visits:
+            return MCTSResult(moves[0], 0.0, total, time.perf_counter() - start)
+        best_move = max(visits, key=visits.get)
+        return MCTSResult(best_move, wins[best_move] / visits[best_move], total, time.perf_counter() - start)
+
+    def close(self):
+        # The shared pool stays up for the next search
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
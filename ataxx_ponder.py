@@ -0,0 +1,86 @@
+"""Pondering: the computer thinks while the human player is on move.
+
+Once the computer has moved, a Ponderer guesses the human's reply and searches
+the position after it in the background. The guess is the reply that the
+search's transposition table prefers, or else the result of a short search. The
+table is kept between moves, so it is warm when the computer is on move,
+whatever the human played. If the human played the guessed move (a ponder hit),
+the pondering result can be played at once, or the search only needs the time
+that is still missing.
+
+The search runs on a thread of the game's own process, so it competes with the
+interface for the interpreter. It is therefore given no more time than the
+computer would have for the move itself: searching for longer could not be used
+on a ponder hit anyway, and once it is done the thread is idle for the rest of
+the human's turn.
+
+The pondering search uses the same AlphaBetaSearch object as the computer's own
+moves, so it has to be stopped before that search starts. take() and stop()
+wait for it.
+"""
+
+from ataxx_worker import BackgroundSearch
+
+# Time for the short search that guesses the reply when the table has no move for it
+PREDICT_TIME = 0.05
+
+
+class Ponderer:
+    def __init__(self, search):
+        self.search = search
+        self.worker = BackgroundSearch()
+        # Hash of the position being pondered and the search result for it
+        self.expected = None
+        self.result = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, position, time_limit):
+        # position has the human to move; the search works on its own copy
+        self.cancel()
+        position = position.copy()
+        self.worker.start(lambda stop_event: self.ponder(position, stop_event, time_limit), lambda _: None)
+
+    def ponder(self, position, stop_event, time_limit):
+        # Runs on the worker thread
+        move = self.predict(position, stop_event)
+        if move is None or stop_event.is_set():
+            return
+        position.make_move(move)
+        if position.is_game_over() or not position.has_valid_moves():
+            return
+        self.expected = position.hash
+        self.result = self.search.search(position, time_limit=time_limit, stop_event=stop_event)
+
+    def predict(self, position, stop_event):
+        moves = position.legal_moves()
+        if not moves:
+            return None
+        entry = self.search.tt.probe(position.hash) if self.search.tt is not None else None
+        if entry is not None:
+            return self.search.order_moves(position, moves, entry[3])[0]
+        return self.search.search(position, time_limit=PREDICT_TIME, stop_event=stop_event).move
+
+    def stop(self):
+        self.worker.cancel()
+
+    def cancel(self):
+        # Stops pondering and forgets its result
+        self.stop()
+        self.expected = None
+        self.result = None
+
+    def take(self, position):
+        # Stops pondering. Returns its result if position (the computer to move)
+        # is the one that was pondered, None if it isn't.
+        self.stop()
+        expected, result = self.expected, self.result
+        self.expected = None
+        self.result = None
+        if expected is None:
+            return None
+        if result is not None and expected == position.hash:
+            self.hits += 1
+            return result
+        self.misses += 1
+        return None
@@ -0,0 +1,260 @@
+"""Alpha-beta search for Ataxx.
+
+A negamax search with alpha-beta pruning and iterative deepening that works on the
+headless AtaxxPosition. Each iteration searches the best move of the previous one
+first, and the remaining moves are ordered by how many pieces they capture. The
+search stops cleanly when its time budget runs out and reports the best move of
+the deepest finished iteration, together with the nodes searched and nodes/second.
+Leaves are scored by a pluggable evaluator from ataxx_eval, by default the tuned
+feature evaluator.
+
+Results are cached in a Zobrist-keyed transposition table, which is kept between
+moves so the work done for one move still helps with the next. When the root
+position is itself symmetric (as openings are) the table is keyed on canonical
+hashes instead, so mirrored, rotated and colour swapped copies of a position
+share one entry; best moves are stored in the canonical orientation and turned
+back when they are read.
+"""
+
+import time
+
+from ataxx_engine import popcount
+from ataxx_eval import FeatureEvaluator
+from ataxx_symmetry import is_symmetric
+from ataxx_tt import EXACT, LOWER_BOUND, NO_MOVE, UPPER_BOUND, TranspositionTable, pack_move, unpack_move
+
+WIN_SCORE = 10000
+INFINITY = 1000000
+
+# How many nodes are searched between two looks at the clock
+CHECK_INTERVAL = 1024
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchResult:
+    def __init__(self, move, score, depth, nodes, elapsed):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nps(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, nps={self.nps:.0f})")
+
+
+def terminal_score(position):
+    # Final score of a finished game from the side to move's point of view. Wins
+    # are pushed far above any evaluation, but a bigger margin is still preferred.
+    margin = position.score()
+    if margin > 0:
+        return WIN_SCORE + margin
+    if margin < 0:
+        return -WIN_SCORE + margin
+    return 0
+
+
+class AlphaBetaSearch:
+    def __init__(self, time_limit=1.0, max_depth=64, tt_size_mb=16, symmetry=True, evaluator=None):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.symmetry = symmetry
+        # Anything with an evaluate(position) method, see ataxx_eval
+        self.evaluator = evaluator or FeatureEvaluator()
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        self.nodes = 0
+        self.deadline = None
+        self.stop_event = None
+        self.root_best = None
+        self.last_result = None
+
+    def get_action(self, position, stop_event=None, time_limit=None):
+        # time_limit overrides the search's own limit for this move only
+        self.last_result = self.search(position, time_limit=time_limit, stop_event=stop_event)
+        return self.last_result.move
+
+    def search(self, position, time_limit=None, max_depth=None, stop_event=None):
+        # stop_event is an optional threading.Event that ends the search early, in
+        # the same way as running out of time
+        if time_limit is None:
+            time_limit = self.time_limit
+        if max_depth is None:
+            max_depth = self.max_depth
+
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit else None
+        self.stop_event = stop_event
+        self.nodes = 0
+        if self.tt is not None:
+            self.tt.new_search()
+            if self.symmetry and position.symmetry_hashes is None and is_symmetric(position):
+                # Searched on a copy, the caller's position stays as fast as it was
+                position = position.copy()
+                position.track_symmetry()
+
+        root_moves = self.order_moves(position, position.legal_moves())
+        if not root_moves:
+            return SearchResult(None, 0, 0, 0, time.perf_counter() - start)
+
+        root_ply = len(position.history)
+        best_move, best_score, finished_depth = root_moves[0], 0, 0
+        for depth in range(1, max_depth + 1):
+            self.root_best = None
+            if depth > 1 and self.should_stop():
+                break
+            try:
+                best_score, best_move = self.search_root(position, root_moves, depth)
+                finished_depth = depth
+            except SearchTimeout:
+                # The search can be stopped anywhere in the tree, so the moves it
+                # had made are taken back before returning
+                while len(position.history) > root_ply:
+                    position.unmake_move()
+                # The previous best move is always searched first, so any move that
+                # already beat it in the unfinished iteration is a safe improvement
+                if self.root_best is not None and self.root_best[1] != root_moves[0]:
+                    best_score, best_move = self.root_best
+                break
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            if abs(best_score) >= WIN_SCORE or len(root_moves) == 1:
+                break
+
+        return SearchResult(best_move, best_score, finished_depth, self.nodes, time.perf_counter() - start)
+
+    def search_root(self, position, moves, depth):
+        alpha, beta = -INFINITY, INFINITY
+        for move in moves:
+            position.make_move(move)
+            score = -self.negamax(position, depth - 1, -beta, -alpha)
+            position.unmake_move()
+            if self.root_best is None or score > self.root_best[0]:
+                self.root_best = (score, move)
+                alpha = max(alpha, score)
+        if self.tt is not None:
+            score, move = self.root_best
+            self.store(position, depth, EXACT, score, move)
+        return self.root_best
+
+    def negamax(self, position, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and self.should_stop():
+            raise SearchTimeout()
+
+        pieces = position.pieces
+        if not pieces[1] or not pieces[2]:
+            return terminal_score(position)
+
+        tt_move = NO_MOVE
+        tt_key = None
+        if self.tt is not None:
+            tt_key = self.tt_key(position)
+            entry = self.tt.probe(tt_key[0])
+            if entry is not None:
+                entry_depth, flag, score, tt_move = entry
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        return score
+                    if flag == LOWER_BOUND and score >= beta:
+                        return score
+                    if flag == UPPER_BOUND and score <= alpha:
+                        return score
+
+        if depth <= 0:
+            return self.evaluate(position)
+
+        moves = position.legal_moves()
+        if not moves:
+            if not position.has_valid_moves(3 - position.active_player):
+                return terminal_score(position)
+            position.make_pass()
+            score = -self.negamax(position, depth - 1, -beta, -alpha)
+            position.unmake_move()
+            return score
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = None
+        for move in self.order_moves(position, moves, tt_move, tt_key):
+            position.make_move(move)
+            score = -self.negamax(position, depth - 1, -beta, -alpha)
+            position.unmake_move()
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if self.tt is not None:
+            if best <= original_alpha:
+                flag = UPPER_BOUND
+            elif best >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.store(position, depth, flag, best, best_move, tt_key)
+        return best
+
+    def tt_key(self, position):
+        # Returns (key, transform index or None)
+        if position.symmetry_hashes is None:
+            return position.hash, None
+        return position.canonical_hash()
+
+    def store(self, position, depth, flag, score, move, tt_key=None):
+        cols = position.cols
+        src = move[0] * cols + move[1]
+        target = move[2] * cols + move[3]
+        key, transform = tt_key or self.tt_key(position)
+        if transform is not None:
+            perm = position.symmetry.perms[transform]
+            src, target = perm[src], perm[target]
+        self.tt.store(key, depth, flag, score, pack_move(src, target))
+
+    def should_stop(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def evaluate(self, position):
+        return self.evaluator.evaluate(position)
+
+    def order_moves(self, position, moves, tt_move=NO_MOVE, tt_key=None):
+        # The best move stored in the transposition table goes first. After it,
+        # moves that capture the most pieces come first, and a clone is worth one
+        # more piece than a jump to the same cell
+        geometry = position.geometry
+        clone_masks = geometry.clone_masks
+        cols = position.cols
+        opponent_pieces = position.pieces[3 - position.active_player]
+
+        def gain(move):
+            src = move[0] * cols + move[1]
+            target = move[2] * cols + move[3]
+            captured = popcount(clone_masks[target] & opponent_pieces)
+            if clone_masks[src] >> target & 1:
+                return captured + 1
+            return captured
+
+        ordered = sorted(moves, key=gain, reverse=True)
+        if tt_move != NO_MOVE:
+            src, target = unpack_move(tt_move)
+            transform = (tt_key or self.tt_key(position))[1]
+            if transform is not None and src < geometry.size and target < geometry.size:
+                inverse = position.symmetry.inverses[transform]
+                src, target = inverse[src], inverse[target]
+            move = position.find_move(src, target, ordered)
+            if move is not None:
+                ordered.remove(move)
+                ordered.insert(0, move)
+        return ordered
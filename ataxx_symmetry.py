@@ -0,0 +1,161 @@
+"""Board symmetries for Ataxx positions.
+
+A square board has the 8 rotations and reflections of the square, a rectangular
+one only the 4 that keep its shape. Blocked cells from custom levels break some
+of them, so the symmetry group of a level is the set of transforms that map its
+blocked cells onto themselves. On top of that, swapping the two colours together
+with the side to move gives an equivalent position, which is why positions are
+canonicalised from the side to move's point of view (own pieces, opponent pieces).
+
+Transforms are square permutations: perm[square] is the square it is moved to.
+"""
+
+import random
+from functools import lru_cache
+
+
+def _dihedral_maps(rows, cols):
+    last_row, last_col = rows - 1, cols - 1
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (last_row - r, c),
+        lambda r, c: (r, last_col - c),
+        lambda r, c: (last_row - r, last_col - c),
+    ]
+    if rows == cols:
+        maps += [
+            lambda r, c: (c, r),
+            lambda r, c: (last_col - c, r),
+            lambda r, c: (c, last_row - r),
+            lambda r, c: (last_col - c, last_row - r),
+        ]
+    return maps
+
+
+@lru_cache(maxsize=None)
+def board_transforms(rows, cols):
+    # Every transform the board shape allows, identity first
+    transforms = []
+    for transform in _dihedral_maps(rows, cols):
+        perm = []
+        for square in range(rows * cols):
+            row, col = transform(*divmod(square, cols))
+            perm.append(row * cols + col)
+        transforms.append(tuple(perm))
+    return tuple(transforms)
+
+
+def transform_mask(mask, perm):
+    result = 0
+    while mask:
+        low = mask & -mask
+        result |= 1 << perm[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+def invert(perm):
+    inverse = [0] * len(perm)
+    for square, image in enumerate(perm):
+        inverse[image] = square
+    return tuple(inverse)
+
+
+@lru_cache(maxsize=256)
+def symmetry_group(rows, cols, blocked):
+    # The transforms that leave the blocked cells where they are, identity first
+    return tuple(perm for perm in board_transforms(rows, cols) if transform_mask(blocked, perm) == blocked)
+
+
+def is_symmetric(position):
+    # True if some transform other than the identity leaves the position as it
+    # is. Only then do mirrored copies of the same positions turn up in its
+    # game tree often enough for canonical hashing to pay off.
+    own = position.pieces[position.active_player]
+    opponent = position.pieces[3 - position.active_player]
+    for perm in symmetry_group(position.rows, position.cols, position.blocked)[1:]:
+        if transform_mask(own, perm) == own and transform_mask(opponent, perm) == opponent:
+            return True
+    return False
+
+
+class SymmetryKeys:
+    # Zobrist keys for hashing a position once per transform of its symmetry
+    # group. There are two hash slots per transform, one for each side to move:
+    # slot 2 * t + (player - 1) hashes the board turned by transform t with
+    # "own" keys for player's pieces and "opponent" keys for the other side's.
+    # The canonical hash is the smallest slot for the side to move, so mirrored
+    # and colour swapped positions share one key.
+    #
+    # slot_keys[slot][p][square] is what a piece of player p on square adds to
+    # the slot, and slot_keys[slot][0][square] is what flipping the piece on
+    # square from one player to the other changes.
+    def __init__(self, rows, cols, blocked):
+        self.perms = symmetry_group(rows, cols, blocked)
+        self.inverses = tuple(invert(perm) for perm in self.perms)
+
+        size = rows * cols
+        rng = random.Random(rows * 1000 + cols + 1)
+        own = [rng.getrandbits(64) for _ in range(size)]
+        opponent = [rng.getrandbits(64) for _ in range(size)]
+        # One key per square, so the base depends on which cells are blocked and
+        # not only on how many. The group maps the blocked cells onto themselves,
+        # so the base is the same in every slot.
+        blocked_keys = [rng.getrandbits(64) for _ in range(size)]
+        self.base = 0
+        for square in range(size):
+            if blocked >> square & 1:
+                self.base ^= blocked_keys[square]
+
+        self.slot_keys = []
+        for perm in self.perms:
+            own_keys = [own[perm[square]] for square in range(size)]
+            opponent_keys = [opponent[perm[square]] for square in range(size)]
+            flip_keys = [key_1 ^ key_2 for key_1, key_2 in zip(own_keys, opponent_keys)]
+            self.slot_keys.append((flip_keys, own_keys, opponent_keys))
+            self.slot_keys.append((flip_keys, opponent_keys, own_keys))
+
+    def hash_all(self, pieces):
+        hashes = []
+        for keys in self.slot_keys:
+            key = self.base
+            for player in (1, 2):
+                player_keys = keys[player]
+                mask = pieces[player]
+                while mask:
+                    low = mask & -mask
+                    key ^= player_keys[low.bit_length() - 1]
+                    mask ^= low
+            hashes.append(key)
+        return tuple(hashes)
+
+    def update(self, hashes, player, src, target, is_jump, captured):
+        # The slot hashes after player moves to target (from src when jumping)
+        # and flips the captured squares
+        flipped = []
+        while captured:
+            low = captured & -captured
+            flipped.append(low.bit_length() - 1)
+            captured ^= low
+        updated = []
+        for key, keys in zip(hashes, self.slot_keys):
+            player_keys = keys[player]
+            key ^= player_keys[target]
+            if is_jump:
+                key ^= player_keys[src]
+            flip_keys = keys[0]
+            for square in flipped:
+                key ^= flip_keys[square]
+            updated.append(key)
+        return tuple(updated)
+
+    def canonical(self, hashes, active_player):
+        # Returns (hash, transform index) for the side to move
+        side_hashes = hashes[active_player - 1::2]
+        key = min(side_hashes)
+        return key, side_hashes.index(key)
+
+
+@lru_cache(maxsize=64)
+def get_symmetry_keys(rows, cols, blocked):
+    return SymmetryKeys(rows, cols, blocked)
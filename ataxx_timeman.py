@@ -0,0 +1,44 @@
+"""Time management for the computer player in timed games.
+
+Splits the time left on the computer's clock over the moves it still expects to
+make. Every move fills at most one empty cell, so the number of empty cells
+gives a good idea of how long the game can still go on. Positions with many
+moves to choose from get more than their share and simple ones less. Part of
+each increment is spent straight away. Whatever each move costs on top of the
+search (the move animation in the game) is set aside for every move left, a
+safety margin is always kept back and no single move may use more than a fixed
+fraction of what is left, so the computer never loses on time.
+"""
+
+# Both players fill cells, so the computer makes about half as many moves as
+# there are empty cells, and never plans for fewer than this
+MIN_MOVES_LEFT = 5
+
+# A position with this many legal moves gets exactly its share of the time
+TYPICAL_MOVES = 30
+
+
+class TimeManager:
+    def __init__(self, overhead=0.0, safety=0.5, min_time=0.05, max_fraction=0.2, increment_share=0.8):
+        self.overhead = overhead
+        self.safety = safety
+        self.min_time = min_time
+        self.max_fraction = max_fraction
+        self.increment_share = increment_share
+
+    def moves_left(self, position):
+        return max(MIN_MOVES_LEFT, position.empty_count() // 2 + 2)
+
+    def complexity(self, position):
+        # Between 0.5 and 1.5, growing with the number of moves to choose from
+        moves = len(position.legal_moves())
+        return min(1.5, max(0.5, (moves / TYPICAL_MOVES) ** 0.5))
+
+    def budget(self, position, remaining, increment=0.0):
+        # Seconds to spend on this move with `remaining` seconds on the clock
+        moves_left = self.moves_left(position)
+        usable = max(0.0, remaining - self.safety - self.overhead * moves_left)
+        share = usable / moves_left + self.increment_share * increment
+        budget = min(share * self.complexity(position), usable * self.max_fraction + self.increment_share * increment,
+                     usable)
+        return max(self.min_time, budget)
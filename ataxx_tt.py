@@ -0,0 +1,105 @@
+"""Fixed-size transposition table for the Ataxx searches.
+
+All of the storage is allocated up front as flat arrays, so memory use stays the
+same no matter how long the game or the search runs. The table is split into
+buckets of two slots: the first one keeps the deepest result seen for its bucket
+(unless it is left over from an older search) and the second one is always
+replaced by the newest result that didn't make it into the first.
+"""
+
+from array import array
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+NO_MOVE = 0
+
+# Bytes taken by one slot: the 64-bit key, the packed data word and the score
+ENTRY_SIZE = 8 + 8 + 4
+
+_MOVE_BITS = 24
+_DEPTH_BITS = 8
+_FLAG_BITS = 2
+_MOVE_MASK = (1 << _MOVE_BITS) - 1
+_DEPTH_MASK = (1 << _DEPTH_BITS) - 1
+_FLAG_MASK = (1 << _FLAG_BITS) - 1
+_DEPTH_SHIFT = _MOVE_BITS
+_FLAG_SHIFT = _DEPTH_SHIFT + _DEPTH_BITS
+_AGE_SHIFT = _FLAG_SHIFT + _FLAG_BITS
+_AGE_MASK = (1 << 16) - 1
+
+
+def pack_move(src, target):
+    # Squares are stored as two 12-bit fields, and NO_MOVE (0) is kept free by
+    # offsetting every real move by one
+    return ((src << 12) | target) + 1
+
+
+def unpack_move(code):
+    code -= 1
+    return code >> 12, code & 0xFFF
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        self.bucket_count = max(1, (size_mb * 1024 * 1024) // (2 * ENTRY_SIZE))
+        slots = self.bucket_count * 2
+        self.keys = array('Q', bytes(8 * slots))
+        self.data = array('q', bytes(8 * slots))
+        self.scores = array('i', bytes(4 * slots))
+        self.age = 0
+        self.hits = 0
+        self.probes = 0
+
+    def clear(self):
+        slots = self.bucket_count * 2
+        self.keys = array('Q', bytes(8 * slots))
+        self.data = array('q', bytes(8 * slots))
+        self.scores = array('i', bytes(4 * slots))
+        self.age = 0
+        self.hits = 0
+        self.probes = 0
+
+    def new_search(self):
+        # Entries from older searches are still used, but the depth-preferred slot
+        # no longer protects them from being replaced
+        self.age = (self.age + 1) & _AGE_MASK
+
+    def probe(self, key):
+        # Returns (depth, flag, score, move_code) or None
+        self.probes += 1
+        index = (key % self.bucket_count) * 2
+        keys = self.keys
+        if keys[index] != key:
+            index += 1
+            if keys[index] != key:
+                return None
+        self.hits += 1
+        data = self.data[index]
+        return ((data >> _DEPTH_SHIFT) & _DEPTH_MASK, (data >> _FLAG_SHIFT) & _FLAG_MASK,
+                self.scores[index], data & _MOVE_MASK)
+
+    def store(self, key, depth, flag, score, move_code=NO_MOVE):
+        index = (key % self.bucket_count) * 2
+        keys = self.keys
+        data = self.data
+        existing = data[index]
+        existing_depth = (existing >> _DEPTH_SHIFT) & _DEPTH_MASK
+        existing_age = (existing >> _AGE_SHIFT) & _AGE_MASK
+        if keys[index] == key:
+            # Keep the move of a previous visit if this one didn't find any
+            if move_code == NO_MOVE:
+                move_code = existing & _MOVE_MASK
+        elif depth < existing_depth and existing_age == self.age:
+            index += 1
+            if keys[index] == key and move_code == NO_MOVE:
+                move_code = data[index] & _MOVE_MASK
+
+        keys[index] = key
+        data[index] = (move_code | (min(depth, _DEPTH_MASK) << _DEPTH_SHIFT)
+                       | (flag << _FLAG_SHIFT) | (self.age << _AGE_SHIFT))
+        self.scores[index] = score
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
@@ -0,0 +1,53 @@
+"""Runs the computer player's thinking on a background thread.
+
+The work function gets a threading.Event that is set when the search should be
+abandoned (the game was reset or ended), and its result is handed back through
+the post function, which the GameScreen points at the Kivy main loop. Results of
+cancelled work are thrown away instead of being posted.
+
+If the work raises, the traceback is printed and the exception is posted to the
+on_error function instead, so the game can carry on without the result rather
+than wait for one forever.
+"""
+
+import threading
+import traceback
+
+
+class BackgroundSearch:
+    def __init__(self, post=None):
+        self.post = post or (lambda callback: callback())
+        self.thread = None
+        self.stop_event = None
+
+    @property
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, work, on_done, on_error=None):
+        # Only one piece of work runs at a time, so anything still going is stopped first
+        self.cancel()
+        stop_event = threading.Event()
+
+        def run():
+            try:
+                result = work(stop_event)
+            except Exception as error:
+                traceback.print_exc()
+                if on_error is not None and not stop_event.is_set():
+                    self.post(lambda: None if stop_event.is_set() else on_error(error))
+                return
+            if not stop_event.is_set():
+                self.post(lambda: None if stop_event.is_set() else on_done(result))
+
+        self.stop_event = stop_event
+        self.thread = threading.Thread(target=run, name="ataxx-ai", daemon=True)
+        self.thread.start()
+
+    def cancel(self, wait=True):
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if wait and self.busy and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        self.stop_event = None
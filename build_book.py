@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Builds or extends the opening book used by the computer player.
+
+Walks the first plies of every level in levels.txt (or of one level), searches
+each position it reaches with the alpha-beta search and stores the best move in
+opening_book.bin. Positions that are mirror images or colour swapped copies of
+one already visited are only searched once. Running it again with more plies or
+a deeper search adds to the existing book, and keeps whichever result for a
+position was searched deeper.
+
+    python build_book.py --plies 4 --depth 5
+    python build_book.py --level "Level 1" --plies 6 --width 4
+"""
+
+import argparse
+import time
+
+from ataxx_book import BOOK_FILE, MAX_CELLS, encode_move, position_check, read_entries, supports, write_book
+from ataxx_engine import AtaxxPosition, load_levels
+from ataxx_search import AlphaBetaSearch
+
+
+def book_level(level, search, entries, plies, width, depth):
+    # Adds the level's opening positions to entries and returns how many were searched
+    frontier = [AtaxxPosition.from_level(level)]
+    seen = set()
+    searched = 0
+    for ply in range(plies):
+        next_frontier = []
+        for position in frontier:
+            key, transform = position.canonical_hash()
+            if key in seen or position.is_game_over():
+                continue
+            seen.add(key)
+
+            check = position_check(position, transform)
+            entry = entries.get(key)
+            if entry is not None and entry[3] != check:
+                # A different position with the same hash; the newer one wins
+                entry = None
+            if entry is None or entry[2] < depth:
+                result = search.search(position)
+                if result.move is None:
+                    continue
+                searched += 1
+                # A time limit or a win can end the search before the requested
+                # depth, and that result mustn't replace a deeper one
+                if entry is None or result.depth > entry[2]:
+                    entries[key] = (encode_move(position, result.move, transform), result.score, result.depth,
+                                    check)
+
+            if ply + 1 < plies:
+                # Replies are expanded in the order the search would try them
+                for move in search.order_moves(position, position.legal_moves())[:width]:
+                    child = position.copy()
+                    child.make_move(move)
+                    if not child.has_valid_moves() and not child.is_game_over():
+                        child.make_pass()
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return searched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Ataxx opening book.")
+    parser.add_argument("--level", help="only book this level (default: every level)")
+    parser.add_argument("--levels-file", default="levels.txt")
+    parser.add_argument("--plies", type=int, default=4, help="how many plies from the start to book")
+    parser.add_argument("--width", type=int, default=None,
+                        help="only follow this many replies per position (default: all of them)")
+    parser.add_argument("--depth", type=int, default=5, help="search depth for every book position")
+    parser.add_argument("--search-time", type=float, default=None,
+                        help="optional time limit per position, in seconds")
+    parser.add_argument("--output", default=BOOK_FILE)
+    args = parser.parse_args()
+
+    levels = load_levels(args.levels_file)
+    if args.level:
+        levels = [level for level in levels if level["name"] == args.level]
+        if not levels:
+            parser.error(f"Level '{args.level}' not found in {args.levels_file}")
+
+    entries = read_entries(args.output)
+    print(f"{len(entries)} positions already in {args.output}")
+    search = AlphaBetaSearch(time_limit=args.search_time, max_depth=args.depth)
+
+    start = time.perf_counter()
+    for level in levels:
+        if not supports(AtaxxPosition.from_level(level)):
+            print(f"{level['name']}: skipped, boards of more than {MAX_CELLS} cells can't be booked")
+            continue
+        level_start = time.perf_counter()
+        searched = book_level(level, search, entries, args.plies, args.width, args.depth)
+        print(f"{level['name']}: {searched} positions searched in {time.perf_counter() - level_start:.1f}s")
+
+    write_book(entries, args.output)
+    print(f"{len(entries)} positions written to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
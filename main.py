@@ -1,3 +1,12 @@
+# The Monte Carlo opponent's worker processes are forked before Kivy is imported,
+# while this process has no threads yet and the workers only get the headless engine.
+# This is a deliberate startup cost: the pool (ataxx_mcts.DEFAULT_WORKERS processes,
+# at most 4) is started on every launch, whether or not the Monte Carlo opponent is
+# ever picked, because once Kivy is running it can no longer be forked safely.
+if __name__ == "__main__":
+    from ataxx_mcts import start_workers
+    start_workers()
+
 from kivy_config_helper import config_kivy
 
 scr_w, scr_h = config_kivy(window_width=800, window_height=600, simulate_device=False, simulate_dpi=192, simulate_density=1.0)
@@ -12,27 +21,50 @@ from kivy.uix.popup import Popup
 from kivy.uix.spinner import Spinner
 from kivy.uix.slider import Slider
 from kivy.uix.checkbox import CheckBox
-from kivy.graphics import Line, Ellipse, Color, Rectangle, RoundedRectangle
+from kivy.uix.progressbar import ProgressBar
+from kivy.graphics import Line, Ellipse, Color, Rectangle, RoundedRectangle, InstructionGroup
+from kivy.uix.widget import Widget
 from kivy.uix.image import Image
 from kivy.animation import Animation
-from kivy.core.audio import SoundLoader
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.textinput import TextInput
 from kivy.clock import Clock
-from collections import deque
+from ataxx_engine import AtaxxPosition, load_levels
+from ataxx_ai import AtaxxAI
+from ataxx_search import WIN_SCORE, AlphaBetaSearch
+from ataxx_mcts import MCTSSearch
+from ataxx_worker import BackgroundSearch
+from ataxx_book import OpeningBook
+from ataxx_endgame import EndgameSolver
+from ataxx_timeman import TimeManager
+from ataxx_ponder import Ponderer
+from ataxx_clock import ChessClock
+from ataxx_audio import audio
+from ataxx_assets import assets
+from ataxx_animation import SPEEDS, BoardAnimator
 import json
-import numpy as np
 import random
-import json
 
 # This class that I created below is responsible for the front screen of the Ataxx game
 class AtaxxStartScreen(BoxLayout):
     settings = {
         "board_level": "Level 1",
         "play_mode": "Player vs Player",
+        "ai_engine": "Alpha-Beta Search",
+        "ai_think_time": 1.0,
+        # Positions with this many empty cells or fewer are solved exactly (0 turns it off)
+        "endgame_empties": 6,
+        # The alpha-beta search keeps thinking while the player is on move
+        "pondering": True,
         "timer_mode": "Unlimited",
         "timer_minutes": 5,
+        # Fischer increment in seconds, added after every move in timed games
+        "timer_increment": 0,
         "show_instructions": True,
+        "sound_volume": 1.0,
+        # How fast moves are animated, one of the ataxx_animation.SPEEDS
+        "animation_speed": "Normal",
+        "sound_muted": False,
     }
     levels = []
 
@@ -52,7 +84,7 @@ class AtaxxStartScreen(BoxLayout):
             Color(0, 0, 0, 1)
             self.bg_base = Rectangle(size=self.size, pos=self.pos)
             Color(0.1, 0.5, 0.1, 1)
-            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, source="./image/grid_pattern.jpg")
+            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, texture=assets.texture("grid_pattern.jpg"))
         self.bind(size=self._update_bg, pos=self._update_bg)
 
         layout = FloatLayout()
@@ -89,6 +121,26 @@ class AtaxxStartScreen(BoxLayout):
 
         layout.add_widget(button_layout)
 
+        # Shown while the images, fonts and sounds are loaded in the background
+        self.loading_bar = ProgressBar(
+            max=1.0,
+            value=assets.progress,
+            size_hint=(0.5, None),
+            height=20,
+            pos_hint={"center_x": 0.5, "y": 0.04},
+        )
+        self.loading_label = Label(
+            text=self.loading_text(assets.progress),
+            font_size="14sp",
+            color=(0.8, 1, 0.8, 1),
+            size_hint=(0.5, None),
+            height=20,
+            pos_hint={"center_x": 0.5, "y": 0.07},
+        )
+        if not assets.finished:
+            layout.add_widget(self.loading_bar)
+            layout.add_widget(self.loading_label)
+
         self.add_widget(layout)
 
     # I referred to the following documentation in order to understand how to load a text file 
@@ -96,11 +148,7 @@ class AtaxxStartScreen(BoxLayout):
     # https://www.geeksforgeeks.org/convert-text-file-to-json-in-python/
     def load_levels(self):
         try:
-            with open("levels.txt", "r") as file:
-                self.levels = json.load(file)
-            for level in self.levels:
-                if not level.get("generated", False):
-                    level["board"] = level["board"][::-1]
+            self.levels = load_levels("levels.txt")
             print("Levels loaded successfully:", self.levels)
         except FileNotFoundError:
             print("Error: levels.txt file not found.")
@@ -129,6 +177,21 @@ class AtaxxStartScreen(BoxLayout):
         self.bg_overlay.size = self.size
         self.bg_overlay.pos = self.pos
 
+    def loading_text(self, progress):
+        return f"Loading... {int(progress * 100)}%"
+
+    def show_loading_progress(self, progress):
+        self.loading_bar.value = progress
+        self.loading_label.text = self.loading_text(progress)
+
+    def loading_finished(self):
+        self.show_loading_progress(1.0)
+        # The background was loaded on its own before the atlas was ready
+        self.bg_overlay.texture = assets.texture("grid_pattern.jpg")
+        anim = Animation(opacity=0, duration=0.5)
+        anim.start(self.loading_bar)
+        anim.start(self.loading_label)
+
     # I referred to the following documentation in order to understand how to animate the
     # title on the front screen for kivy:
     # https://www.youtube.com/watch?v=i8OU93pHiS0
@@ -188,15 +251,9 @@ class AtaxxStartScreen(BoxLayout):
     # I used this documentation several times for the other areas where I needed to use sound 
     # https://kivy.org/doc/stable-2.2.0/api-kivy.core.audio.html
     def play_background_music(self):
-        self.music = SoundLoader.load('./sound/start_screen_music.mp3')
+        self.music = audio.play_music(volume=0.10)
         if self.music:
-            print("Music loaded successfully:", self.music.source)
-            self.music.loop = True
-            self.music.volume = 0.10
-            self.music.play()
             print("Music is playing.")
-        else:
-            print("Failed to load music.")
 
     # I referred to the offical documentation for the Kivy Popup in order to be able to integrate within my application.
     # Specifically, I used to understand how other components like a slider or button could be integrated within here
@@ -230,6 +287,40 @@ class AtaxxStartScreen(BoxLayout):
         )
         popup_layout.add_widget(mode_spinner)
 
+        popup_layout.add_widget(Label(text="Computer Opponent:", font_size="16sp"))
+        engine_spinner = Spinner(
+            text=self.settings["ai_engine"],
+            values=["Alpha-Beta Search", "Monte Carlo Tree Search", "Neural Network"],
+            size_hint=(1, None),
+            height=44,
+        )
+        popup_layout.add_widget(engine_spinner)
+
+        ponder_layout = BoxLayout(orientation="horizontal", spacing=10)
+        ponder_layout.add_widget(Label(text="Computer Thinks on Your Turn", font_size="14sp"))
+        ponder_checkbox = CheckBox(active=self.settings.get("pondering", True))
+        ponder_layout.add_widget(ponder_checkbox)
+        popup_layout.add_widget(ponder_layout)
+
+        animation_layout = BoxLayout(orientation="horizontal", spacing=10)
+        animation_layout.add_widget(Label(text="Animations:", font_size="14sp"))
+        animation_spinner = Spinner(
+            text=self.settings.get("animation_speed", "Normal"),
+            values=list(SPEEDS),
+            size_hint=(1, None),
+            height=44,
+        )
+        animation_layout.add_widget(animation_spinner)
+        popup_layout.add_widget(animation_layout)
+
+        sound_layout = BoxLayout(orientation="horizontal", spacing=10)
+        sound_layout.add_widget(Label(text="Sound", font_size="14sp"))
+        sound_checkbox = CheckBox(active=not self.settings.get("sound_muted", False))
+        sound_layout.add_widget(sound_checkbox)
+        volume_slider = Slider(min=0, max=1, value=self.settings.get("sound_volume", 1.0))
+        sound_layout.add_widget(volume_slider)
+        popup_layout.add_widget(sound_layout)
+
         popup_layout.add_widget(Label(text="Timer Mode:", font_size="16sp"))
         timer_layout = BoxLayout(orientation="horizontal", spacing=10)
         unlimited_checkbox = CheckBox(group="timer", active=self.settings["timer_mode"] == "Unlimited")
@@ -254,12 +345,30 @@ class AtaxxStartScreen(BoxLayout):
             height=44,
         )
         slider_layout.add_widget(timer_slider)
+        increment_label = Label(
+            text=f"Increment (Seconds) per Move: {self.settings.get('timer_increment', 0)}",
+            font_size="14sp"
+        )
+        slider_layout.add_widget(increment_label)
+        increment_slider = Slider(
+            min=0,
+            max=30,
+            step=1,
+            value=self.settings.get("timer_increment", 0),
+            size_hint=(1, None),
+            height=44,
+        )
+        slider_layout.add_widget(increment_slider)
         popup_layout.add_widget(slider_layout)
 
         def update_slider_label(instance, value):
             slider_label.text = f"Set Time (Minutes) for Each Player: {int(value)}"
 
+        def update_increment_label(instance, value):
+            increment_label.text = f"Increment (Seconds) per Move: {int(value)}"
+
         timer_slider.bind(value=update_slider_label)
+        increment_slider.bind(value=update_increment_label)
 
         # I referred to the following documentation in order to able to integrate a slider into the
         # save settings popup where the user can adjust the number of minutes for a given game
@@ -268,10 +377,12 @@ class AtaxxStartScreen(BoxLayout):
             if limited_checkbox.active:
                 slider_layout.opacity = 1
                 timer_slider.disabled = False
+                increment_slider.disabled = False
                 slider_label.text = f"Set Time (Minutes) for Each Player: {int(timer_slider.value)}"
             else:
                 slider_layout.opacity = 0.5
                 timer_slider.disabled = True
+                increment_slider.disabled = True
                 slider_label.text = "Set Time (Minutes) for Each Player: Unlimited"
 
         toggle_slider()
@@ -282,9 +393,17 @@ class AtaxxStartScreen(BoxLayout):
         def save_settings(*args):
             self.settings["board_level"] = board_spinner.text
             self.settings["play_mode"] = mode_spinner.text
+            self.settings["ai_engine"] = engine_spinner.text
+            self.settings["pondering"] = ponder_checkbox.active
+            self.settings["animation_speed"] = animation_spinner.text
+            self.settings["sound_muted"] = not sound_checkbox.active
+            self.settings["sound_volume"] = volume_slider.value
+            audio.set_volume(volume_slider.value)
+            audio.set_muted(not sound_checkbox.active)
             if limited_checkbox.active:
                 self.settings["timer_mode"] = "Limited"
                 self.settings["timer_minutes"] = int(timer_slider.value)
+                self.settings["timer_increment"] = int(increment_slider.value)
             else:
                 self.settings["timer_mode"] = "Unlimited"
                 self.settings["timer_minutes"] = 1
@@ -342,6 +461,9 @@ class AtaxxStartScreen(BoxLayout):
 
         if existing_game_screen:
             print("Resetting existing game screen...")
+            for old_game in existing_game_screen.children:
+                if isinstance(old_game, GameScreen):
+                    old_game.shutdown()
             existing_game_screen.clear_widgets()
             existing_game_screen.add_widget(GameScreen(selected_level, self.settings, is_vs_computer))
         else:
@@ -356,29 +478,184 @@ class AtaxxStartScreen(BoxLayout):
         print("Exiting the game...")
         App.get_running_app().stop()
 
+# The board of a game or of the level editor as a single widget. The cell backgrounds
+# are one instruction group under the pieces and the grid lines another one on top
+# of them, and a touch is mapped to its cell arithmetically instead of being passed
+# through a button per cell. Pressing a cell fires on_cell_press(row, col) and lights
+# the cell up until the touch ends. Whatever the screen draws in the widget's canvas
+# (the pieces) goes between the two groups.
+#
+# I referred to the following documentation that shows how to build an array based
+# grid in Python and how it can be clicked upon throughout the course of the application.
+# I used this documentation as a source in order to understand how to create a similar
+# grid based structure for this game in Kivy
+# https://learn.arcade.academy/en/latest/chapters/28_array_backed_grids/array_backed_grids.html
+class BoardWidget(Widget):
+    def __init__(self, rows, cols, cell_size, grid_x, grid_y, blocked=(), cell_color=None, press_color=None,
+                 **kwargs):
+        super().__init__(size_hint=(None, None), size=(cols * cell_size, rows * cell_size), pos=(grid_x, grid_y),
+                         **kwargs)
+        self.register_event_type("on_cell_press")
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.blocked = set(blocked)
+        self.cell_color = cell_color
+        self.press_color = press_color
+        self.pressed = None
+
+        # Colour instructions of the cell backgrounds, by (row, col)
+        self.background_colors = {}
+        self.background = InstructionGroup()
+        for row in range(rows):
+            for col in range(cols):
+                x, y = self.cell_pos(row, col)
+                if (row, col) in self.blocked:
+                    self.background.add(Color(0.5, 0.5, 0.5, 1))
+                    self.background.add(Rectangle(pos=(x, y), size=(cell_size, cell_size)))
+                elif cell_color is not None:
+                    color = Color(*cell_color)
+                    self.background.add(color)
+                    self.background.add(RoundedRectangle(pos=(x, y), size=(cell_size, cell_size), radius=[10]))
+                    self.background_colors[(row, col)] = color
+        self.canvas.before.add(self.background)
+        self.lines = InstructionGroup()
+        self.canvas.after.add(self.lines)
+
+    # I had to refer to the offical Kivy documentation in order to understand how to draw the lines
+    # that were necessary for this game such that they were a in grid based format
+    def add_lines(self, color, width):
+        self.lines.add(Color(*color))
+        for i in range(self.rows + 1):
+            y = self.y + i * self.cell_size
+            self.lines.add(Line(points=[self.x, y, self.right, y], width=width))
+        for j in range(self.cols + 1):
+            x = self.x + j * self.cell_size
+            self.lines.add(Line(points=[x, self.y, x, self.top], width=width))
+
+    def cell_pos(self, row, col):
+        return self.x + col * self.cell_size, self.y + row * self.cell_size
+
+    def cell_at(self, x, y):
+        row = int((y - self.y) // self.cell_size)
+        col = int((x - self.x) // self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def on_touch_down(self, touch):
+        cell = self.cell_at(*touch.pos)
+        if cell is None:
+            return super().on_touch_down(touch)
+        if cell in self.blocked:
+            return True
+        # I referred to the following documentation in order understand how to have
+        # a mouse hover effect for the appropiate traversable cells in Kivy
+        # https://stackoverflow.com/questions/58190402/implement-a-kivy-button-mouseover-event
+        if self.press_color is not None and cell in self.background_colors:
+            self.pressed = cell
+            self.background_colors[cell].rgba = self.press_color
+        self.dispatch("on_cell_press", *cell)
+        return True
+
+    def on_touch_up(self, touch):
+        if self.pressed is not None:
+            self.background_colors[self.pressed].rgba = self.cell_color
+            self.pressed = None
+        return super().on_touch_up(touch)
+
+    def on_cell_press(self, row, col):
+        pass
+
+
+# The drawing instructions of one board cell: the highlight shown when the selected
+# piece can move there, and the piece itself with its shadow and the glow that marks
+# it as selected. They are made once when the board is built and afterwards only
+# change colour, so the canvas stays the same size however long the game goes on.
+#
+# I referred to the following Stack Over flow post in order to understand how to draw
+# the appropiate circle within my Kivy application
+# https://stackoverflow.com/questions/72118415/kivy-draw-circle-to-middle-of-screen-on-startup
+class CellGraphics:
+    def __init__(self, x, y, cell_size):
+        center_x = x + cell_size / 2
+        center_y = y + cell_size / 2
+        radius = cell_size * 0.4
+        self.highlight_color = Color(1, 1, 0, 0)
+        self.highlight = RoundedRectangle(pos=(x, y), size=(cell_size, cell_size), radius=[10])
+        self.shadow_color = Color(0, 0, 0, 0)
+        self.shadow = Ellipse(pos=(center_x - radius - 5, center_y - radius - 5), size=(radius * 2, radius * 2))
+        self.color = Color(0, 0, 0, 0)
+        self.circle = Ellipse(pos=(center_x - radius, center_y - radius), size=(radius * 2, radius * 2))
+        self.glow_color = Color(1, 1, 1, 0)
+        self.glow = Ellipse(pos=(center_x - radius - 10, center_y - radius - 10),
+                            size=(radius * 2 + 20, radius * 2 + 20))
+        self.owner = None
+
+    @property
+    def has_piece(self):
+        return self.owner is not None
+
+    def set_piece(self, color, owner):
+        self.color.rgba = color
+        self.shadow_color.a = 0.5
+        self.owner = owner
+
+    def clear(self):
+        self.color.a = 0
+        self.shadow_color.a = 0
+        self.glow_color.a = 0
+        self.owner = None
+
+    def set_glow(self, on):
+        self.glow_color.a = 0.5 if on else 0
+
+    def set_highlight(self, on):
+        self.highlight_color.a = 0.5 if on else 0
+
+
 # This class is responsible for implementing the game logic on the board for the Ataxx game
 class GameScreen(FloatLayout):
     def __init__(self, selected_level, settings, is_vs_computer=False, **kwargs):
         super().__init__(**kwargs)
-        self.circle_references = {}
+        # The CellGraphics of every cell that isn't blocked, by (row, col)
+        self.cell_graphics = {}
+        # Cells highlighted as moves of the selected piece
+        self.valid_glow_references = []
         self.selected_circle = None
         self.ai_character = None
+        self.ai_event = None
+        # Set while a move is being animated, the position only changes once the piece lands
+        self.move_in_progress = False
+        # Every move is played as one timeline: the moving piece, the captures and the sounds
+        self.animator = BoardAnimator(SPEEDS.get(settings.get("animation_speed", "Normal"), 1.0))
+        # The computer thinks on a background thread and its move is handed back
+        # to the Kivy main loop once it is ready
+        self.ai_worker = BackgroundSearch(post=lambda callback: Clock.schedule_once(lambda dt: callback()))
+        # Built by build_book.py, the game plays without one too
+        self.opening_book = OpeningBook.open() if is_vs_computer else None
+        # In timed games the computer's think time comes from its clock
+        self.time_manager = TimeManager()
+        # Set up with the computer player when pondering is switched on
+        self.ponderer = None
         
         self.is_vs_computer = is_vs_computer
         self.settings = settings
+        # The clock is paused while moves are animated and while popups are open
         if self.settings["timer_mode"] == "Limited":
-            self.player_1_time = self.settings["timer_minutes"] * 60
-            self.player_2_time = self.settings["timer_minutes"] * 60
+            self.clock = ChessClock(self.settings["timer_minutes"] * 60, self.settings.get("timer_increment", 0),
+                                    on_flag=self.on_flag)
         else:
-            self.player_1_time = None
-            self.player_2_time = None
+            self.clock = None
+        self.flag_event = None
+        # Both players' time before each ply, by the number of plies played before it
+        self.clock_states = {}
         self.active_player = 1
 
         cols = selected_level["size"][1]
         rows = selected_level["size"][0]
         self.cols = cols
         self.rows = rows
-        self.board_state = [[0 for _ in range(cols)] for _ in range(rows)]
 
         padding = 10
         cell_size = min((scr_w - 2 * padding) // cols, (scr_h - 2 * padding) // rows)
@@ -397,10 +674,18 @@ class GameScreen(FloatLayout):
             Color(0, 0, 0, 1)
             self.bg_base = Rectangle(size=self.size, pos=self.pos)
             Color(0.1, 0.5, 0.1, 1)
-            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, source="./image/grid_pattern.jpg")
+            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, texture=assets.texture("grid_pattern.jpg"))
 
         self.bind(size=self._update_bg, pos=self._update_bg)
 
+        blocked = [(row, col) for row in range(rows) for col in range(cols) if selected_level["board"][row][col] == 9]
+        self.board = BoardWidget(rows, cols, cell_size, grid_x, grid_y, blocked=blocked,
+                                 cell_color=(0.2, 0.6, 0.2, 0.5), press_color=(0.3, 0.8, 0.3, 1))
+        self.board.add_lines((0.8, 0.8, 0.8, 1), 2)
+        self.board.bind(on_cell_press=self.on_cell_click)
+        self.add_widget(self.board)
+
+        self.build_cell_graphics(selected_level)
         self.reset_game(selected_level)
         self.player_1_count = sum(cell == 1 for row in selected_level["board"] for cell in row)
         self.player_2_count = sum(cell == 2 for row in selected_level["board"] for cell in row)
@@ -425,7 +710,7 @@ class GameScreen(FloatLayout):
             size_hint=(None, None),
         )
         self.player_1_timer = Label(
-            text=self.format_time(self.player_1_time),
+            text=self.format_time(self.clock.time_left(1) if self.clock else None),
             font_size="20sp",
             color=(1, 1, 1, 1),
             pos=(grid_x - 250, grid_y + grid_height / 2 - 20),
@@ -452,7 +737,7 @@ class GameScreen(FloatLayout):
             size_hint=(None, None),
         )
         self.player_2_timer = Label(
-            text=self.format_time(self.player_2_time),
+            text=self.format_time(self.clock.time_left(2) if self.clock else None),
             font_size="20sp",
             color=(1, 1, 1, 1),
             pos=(grid_x + grid_width + 150, grid_y + grid_height / 2 - 20),
@@ -463,26 +748,25 @@ class GameScreen(FloatLayout):
         self.add_widget(self.player_2_piece_count)
         self.add_widget(self.player_2_timer)
 
-        # I had to refer to the offical Kivy documentation in order to understand how to draw the lines
-        # that were necessary for this game such that they were a in grid based format
-        with self.canvas:
-            Color(0.8, 0.8, 0.8, 1)
-            for i in range(rows + 1):
-                y = grid_y + i * cell_size
-                Line(points=[grid_x, y, grid_x + grid_width, y], width=2)
-            for j in range(cols + 1):
-                x = grid_x + j * cell_size
-                Line(points=[x, grid_y, x, grid_y + grid_height], width=2)
-
-        self.cells = []
-        for row_idx in range(rows):
-            row = []
-            for col_idx in range(cols):
-                cell = self.create_cell_widget(row_idx, col_idx, cell_size, grid_x, grid_y)
-                row.append(cell)
-            self.cells.append(row)
-
-        self.timer_event = Clock.schedule_interval(self.update_timer, 1)
+        # Takes back moves using the position's own undo stack. Against the computer
+        # it goes back to the last move that player 1 made.
+        self.undo_button = Button(
+            text="Undo Move",
+            font_size="16sp",
+            size_hint=(None, None),
+            size=(140, 44),
+            pos=(grid_x - 250, grid_y),
+            background_normal="",
+            background_color=(0.2, 0.6, 0.2, 1),
+        )
+        self.undo_button.bind(on_press=self.undo_move)
+        self.add_widget(self.undo_button)
+
+        # The display is refreshed ten times a second, the time itself comes from the clock
+        self.timer_event = Clock.schedule_interval(self.update_timer, 0.1)
+        if self.clock:
+            self.clock.switch(self.active_player)
+            self.arm_flag()
         
         # I used the is_vs_computer tracker numerous time through the application to determine whether
         # or not the user was in the player vs computer mode. If they were in that mode, then it
@@ -494,36 +778,25 @@ class GameScreen(FloatLayout):
         Clock.schedule_once(lambda dt: self.show_instructions_popup(), 0.5)
 
 
-    def reset_game(self, selected_level):
-        for (row, col) in list(self.circle_references.keys()):
-            self.clear_cell(row, col)
-        self.circle_references.clear()
-        self.board_state = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        for row_idx, row in enumerate(selected_level["board"]):
-            for col_idx, cell_value in enumerate(row):
-                if cell_value == 9:
-                    self.board_state[row_idx][col_idx] = 9
-                    with self.canvas.before:
-                        Color(0.5, 0.5, 0.5, 1)
-                        Rectangle(
-                            pos=(
-                                self.grid_x + col_idx * self.cell_size,
-                                self.grid_y + row_idx * self.cell_size,
-                            ),
-                            size=(self.cell_size, self.cell_size),
+    def build_cell_graphics(self, selected_level):
+        with self.board.canvas:
+            for row_idx, row in enumerate(selected_level["board"]):
+                for col_idx, cell_value in enumerate(row):
+                    if cell_value != 9:
+                        self.cell_graphics[(row_idx, col_idx)] = CellGraphics(
+                            self.grid_x + col_idx * self.cell_size, self.grid_y + row_idx * self.cell_size,
+                            self.cell_size
                         )
-                elif cell_value == 1:
-                    self.board_state[row_idx][col_idx] = 1
-                    self.draw_circle(
-                        self.grid_x, self.grid_y, col_idx, row_idx, self.cell_size, (0, 0, 1, 1),
-                        is_starting_cell=True, owner=1
-                    )
-                elif cell_value == 2:
-                    self.board_state[row_idx][col_idx] = 2
-                    self.draw_circle(
-                        self.grid_x, self.grid_y, col_idx, row_idx, self.cell_size, (1, 0, 0, 1),
-                        is_starting_cell=True, owner=2
-                    )
+            # The piece that travels during move animations, hidden the rest of the time
+            self.mover_color = Color(0, 0, 0, 0)
+            self.mover = Ellipse(pos=(0, 0), size=(0, 0))
+
+    def reset_game(self, selected_level):
+        # All of the game rules are handled by the headless AtaxxPosition, the
+        # GameScreen only takes care of drawing it and forwarding the clicks
+        self.position = AtaxxPosition.from_level(selected_level)
+        self.active_player = self.position.active_player
+        self.redraw_pieces()
 
     def show_instructions_popup(self):
         if not self.settings.get("show_instructions", True):
@@ -570,6 +843,8 @@ class GameScreen(FloatLayout):
             
         close_button.bind(on_press=disable_future_popups)
         close_button.bind(on_press=popup.dismiss)
+        self.pause_clock()
+        popup.bind(on_dismiss=lambda *_: self.resume_clock())
         popup.open()
 
     def _update_bg(self, *args):
@@ -578,118 +853,72 @@ class GameScreen(FloatLayout):
         self.bg_overlay.size = self.size
         self.bg_overlay.pos = self.pos
 
-    # I referred to the following documentation that shows how to build an array based
-    # grid in Python and how it can be clicked upon throughout the course of the application.
-    # I used this documentation as a source in order to understand how to create a similar
-    # grid based structure for this game in Kivy
-    # https://learn.arcade.academy/en/latest/chapters/28_array_backed_grids/array_backed_grids.html
-    def create_cell_widget(self, row, col, cell_size, grid_x, grid_y):
-        cell_value = self.board_state[row][col]
-        if cell_value == 9:
-            with self.canvas.before:
-                Color(0.5, 0.5, 0.5, 1)
-                Rectangle(pos=(grid_x + col * cell_size, grid_y + row * cell_size), size=(cell_size, cell_size))
-            return None
-
-        cell_button = Button(
-            size_hint=(None, None),
-            size=(cell_size, cell_size),
-            pos=(grid_x + col * cell_size, grid_y + row * cell_size),
-            background_normal="",
-            background_color=(0, 0, 0, 0),
-        )
-        cell_button.cell_coords = (col, row)
-
-        with cell_button.canvas.before:
-            Color(0.2, 0.6, 0.2, 0.5)
-            RoundedRectangle(size=cell_button.size, pos=cell_button.pos, radius=[10])
-
-        # I referred to the following documentation in order understand how to have
-        # a mouse hover effect for the appropiate traversable cells in Kivy
-        # https://stackoverflow.com/questions/58190402/implement-a-kivy-button-mouseover-event
-        def hover_effect(instance, touch):
-            if instance.collide_point(*touch.pos):
-                instance.canvas.before.clear()
-                with instance.canvas.before:
-                    Color(0.3, 0.8, 0.3, 1)
-                    RoundedRectangle(size=instance.size, pos=instance.pos, radius=[10])
-
-        def unhover_effect(instance, touch):
-            instance.canvas.before.clear()
-            with instance.canvas.before:
-                Color(0.2, 0.6, 0.2, 0.5)
-                RoundedRectangle(size=instance.size, pos=instance.pos, radius=[10])
-
-        cell_button.bind(on_touch_down=hover_effect, on_touch_up=unhover_effect)
-        cell_button.bind(on_press=self.on_cell_click)
-        self.add_widget(cell_button)
-        return cell_button
-
-    # I referred to the following Stack Over flow post in order to understand how to draw
-    # the appropiate circle within my Kivy application
-    # https://stackoverflow.com/questions/72118415/kivy-draw-circle-to-middle-of-screen-on-startup
-    def draw_circle(self, grid_x, grid_y, col, row, cell_size, color, is_starting_cell=False, owner=None):
-        center_x = grid_x + col * cell_size + cell_size / 2
-        center_y = grid_y + row * cell_size + cell_size / 2
-        radius = cell_size * 0.4
-
-        # Clear existing circle if any
-        self.clear_cell(row, col)
-
-        with self.canvas:
-            shadow_color = Color(0, 0, 0, 0.5)
-            shadow = Ellipse(pos=(center_x - radius - 5, center_y - radius - 5), size=(radius * 2, radius * 2))
+    def draw_circle(self, row, col, color, owner):
+        self.cell_graphics[(row, col)].set_piece(color, owner)
 
-            circle_color = Color(*color)
-            circle = Ellipse(pos=(center_x - radius, center_y - radius), size=(radius * 2, radius * 2))
-
-        self.circle_references[(row, col)] = {
-            'circle': circle,
-            'shadow': shadow,
-            'color': circle_color,
-            'is_starting_cell': is_starting_cell,
-            'owner': owner
-        }
-        
     def format_time(self, time_seconds):
         if time_seconds is None:
             return ""
-        minutes = time_seconds // 60
-        seconds = time_seconds % 60
+        # Tenths of a second are shown once less than ten seconds are left
+        if time_seconds < 10:
+            return f"00:{time_seconds:04.1f}"
+        minutes, seconds = divmod(int(time_seconds), 60)
         return f"{minutes:02}:{seconds:02}"
 
     # I referred to the following Stack Over flow post in order to understand 
     # how to implement the timers for each player in Kivy and have them be
     # delivered to the user at the begining of the game
     def update_timer(self, dt):
-        if self.settings["timer_mode"] == "Unlimited":
+        if self.clock is None:
             return
-        
-        if self.active_player == 1:
-            if self.player_1_time > 0:
-                self.player_1_time -= 1
-                self.player_1_timer.text = self.format_time(self.player_1_time)
-            else:
-                print("Player 1's time is up!")
-                Clock.unschedule(self.update_timer)
-                self.end_game(winner=2)
-        elif self.active_player == 2:
-            if self.player_2_time > 0:
-                self.player_2_time -= 1
-                self.player_2_timer.text = self.format_time(self.player_2_time)
-            else:
-                print("Player 2's time is up!")
-                Clock.unschedule(self.update_timer)
-                self.end_game(winner=1)
-
-    def on_cell_click(self, instance):
+        self.player_1_timer.text = self.format_time(self.clock.time_left(1))
+        self.player_2_timer.text = self.format_time(self.clock.time_left(2))
+        self.clock.update()
+
+    # The clock is looked at exactly when the running player's time is due to run
+    # out, so a flag doesn't wait for the next display refresh
+    def arm_flag(self):
+        if self.flag_event is not None:
+            self.flag_event.cancel()
+            self.flag_event = None
+        deadline = self.clock.deadline() if self.clock else None
+        if deadline is not None:
+            self.flag_event = Clock.schedule_once(lambda dt: self.check_flag(), deadline)
+
+    def check_flag(self):
+        self.flag_event = None
+        if self.clock.update() is None:
+            self.arm_flag()
+
+    def on_flag(self, player):
+        print(f"Player {player}'s time is up!")
+        self.update_timer(0)
+        self.end_game(winner=3 - player)
+
+    # Called before every move and pass, so that undoing it can put the time back as it was
+    def save_clock(self):
+        if self.clock:
+            self.clock_states[len(self.position.history)] = self.clock.snapshot()
+
+    def pause_clock(self):
+        if self.clock:
+            self.clock.pause()
+            self.arm_flag()
+
+    def resume_clock(self):
+        if self.clock:
+            self.clock.resume()
+            self.arm_flag()
+
+    def on_cell_click(self, board, target_row, target_col):
         if self.is_vs_computer and self.active_player == 2:
             print("It's the AI's turn. Please wait.")
             return
-        target_col, target_row = instance.cell_coords
+        if self.move_in_progress:
+            return
 
         if self.selected_circle is None:
-            if self.board_state[target_row][target_col] == self.active_player:
+            if self.position.cell(target_row, target_col) == self.active_player:
                 self.selected_circle = (target_row, target_col)
                 self.add_glow_effect(target_row, target_col)
                 self.add_valid_cell_glow(target_row, target_col)
@@ -700,22 +929,17 @@ class GameScreen(FloatLayout):
         src_row, src_col = self.selected_circle
         distance = max(abs(src_row - target_row), abs(src_col - target_col))
 
-        if self.board_state[target_row][target_col] != 0:
+        if self.position.cell(target_row, target_col) != 0:
             print("Invalid move: Target cell is occupied or blocked.")
             self.remove_glow_effect()
             self.remove_valid_cell_glow()
             self.selected_circle = None
             return
 
-        if distance == 1:
+        if distance == 1 or distance == 2:
             self.remove_glow_effect()
             self.remove_valid_cell_glow()
-            self.animate_movement(src_row, src_col, target_row, target_col, is_jump=False)
-            self.selected_circle = None
-        elif distance == 2:
-            self.remove_glow_effect()
-            self.remove_valid_cell_glow()
-            self.animate_jump(src_row, src_col, target_row, target_col)
+            self.play_move(src_row, src_col, target_row, target_col)
             self.selected_circle = None
         else:
             print("Invalid move: Target cell is not valid.")
@@ -731,32 +955,20 @@ class GameScreen(FloatLayout):
         # expandable tranversable cells so that I could display theme at ease
         # for a praticular instance of a clicked circle and then removing those
         # cells later on
-        self.valid_glow_references = []
+        self.remove_valid_cell_glow()
 
         for target_row in range(self.rows):
             for target_col in range(self.cols):
                 distance = max(abs(row - target_row), abs(col - target_col))
 
-                if (distance == 1 or distance == 2) and self.board_state[target_row][target_col] == 0:
-                    cell_x = self.grid_x + target_col * self.cell_size
-                    cell_y = self.grid_y + target_row * self.cell_size
-
-                    with self.canvas:
-                        Color(1, 1, 0, 0.5)
-                        glow_rect = RoundedRectangle(
-                            pos=(cell_x, cell_y),
-                            size=(self.cell_size, self.cell_size),
-                            radius=[10]
-                        )
-
-                    self.valid_glow_references.append(glow_rect)
+                if (distance == 1 or distance == 2) and self.position.cell(target_row, target_col) == 0:
+                    graphics = self.cell_graphics[(target_row, target_col)]
+                    graphics.set_highlight(True)
+                    self.valid_glow_references.append(graphics)
 
     def remove_valid_cell_glow(self):
-        if not hasattr(self, 'valid_glow_references') or not self.valid_glow_references:
-            return
-
-        for glow_rect in self.valid_glow_references:
-            self.canvas.remove(glow_rect)
+        for graphics in self.valid_glow_references:
+            graphics.set_highlight(False)
 
         self.valid_glow_references = []
 
@@ -765,275 +977,324 @@ class GameScreen(FloatLayout):
     # player be visually glowed on screen
     # https://kivy.org/doc/stable/api-kivy.graphics.html
     def add_glow_effect(self, row, col):
-        references = self.circle_references.get((row, col))
-        if not references:
+        graphics = self.cell_graphics.get((row, col))
+        if graphics is None or not graphics.has_piece:
             print(f"No circle found at ({row}, {col}) for glowing effect.")
             return
-        circle = references['circle']
-
-        with self.canvas:
-            Color(1, 1, 1, 0.5)
-            glow_circle = Ellipse(
-                pos=(circle.pos[0] - 10, circle.pos[1] - 10),
-                size=(circle.size[0] + 20, circle.size[1] + 20)
-            )
-        references['glow_circle'] = glow_circle
+        graphics.set_glow(True)
 
     def remove_glow_effect(self):
         if self.selected_circle is None:
             return
 
-        row, col = self.selected_circle
-        references = self.circle_references.get((row, col))
-        if not references:
-            return
+        graphics = self.cell_graphics.get(self.selected_circle)
+        if graphics is not None:
+            graphics.set_glow(False)
 
-        glow_circle = references.pop('glow_circle', None)
-        if glow_circle:
-            self.canvas.remove(glow_circle)
+    # A move is played as one timeline on the animator: the piece travels, then lands,
+    # which is when the position changes and the captured pieces start to change
+    # colour, and once the captures are shown the turn passes to the other player
+    def play_move(self, src_row, src_col, target_row, target_col):
+        self.move_in_progress = True
+        self.pause_clock()
+        if max(abs(src_row - target_row), abs(src_col - target_col)) == 2:
+            self.animate_jump(src_row, src_col, target_row, target_col)
+        else:
+            self.animate_movement(src_row, src_col, target_row, target_col)
+        self.animator.play(on_finish=self.complete_move)
 
-    def complete_move(self, src_row, src_col, target_row, target_col, is_jump):
+    def land_move(self, src_row, src_col, target_row, target_col, is_jump):
         color = (0, 0, 1, 1) if self.active_player == 1 else (1, 0, 0, 1)  # Blue for Player 1, Red for Player 2
-        self.draw_circle(self.grid_x, self.grid_y, target_col, target_row, self.cell_size, color)
-
-        self.board_state[target_row][target_col] = self.active_player
-
-        self.convert_adjacent_pieces(target_row, target_col)
-
+        self.mover_color.a = 0
         if is_jump:
-            self.board_state[src_row][src_col] = 0
             self.clear_cell(src_row, src_col)
+        self.draw_circle(target_row, target_col, color, self.active_player)
+
+        self.save_clock()
+        captured = self.position.make_move((src_row, src_col, target_row, target_col))
+        flipped = self.position.cells_of(captured)
 
-        sound = SoundLoader.load('./sound/jump.wav' if is_jump else './sound/move.mp3')
-        if sound:
-            sound.play()
+        self.convert_adjacent_pieces(flipped, color)
+
+        audio.play('jump.wav' if is_jump else 'move.mp3')
 
         self.update_piece_counts()
+
+    def complete_move(self):
+        self.move_in_progress = False
+        # Only a completed move earns the increment, not a pass or an undo
+        if self.clock:
+            self.clock.add_increment(self.active_player)
+        self.resume_clock()
         self.switch_turn()
         
         self.check_game_end()        
 
-    def convert_adjacent_pieces(self, row, col):
-        opponent = 2 if self.active_player == 1 else 1
-        color = (0, 0, 1, 1) if self.active_player == 1 else (1, 0, 0, 1)
-        directions = [
-            (-1, 0),
-            (1, 0),
-            (0, -1),
-            (0, 1),
-            (-1, -1),
-            (-1, 1),
-            (1, -1),
-            (1, 1),
-        ]
-
-        conversion_happened = False
-
-        for d_row, d_col in directions:
-            adj_row = row + d_row
-            adj_col = col + d_col
-
-            if 0 <= adj_row < self.rows and 0 <= adj_col < self.cols:
-                if self.board_state[adj_row][adj_col] == opponent:
-                    self.board_state[adj_row][adj_col] = self.active_player
-                    self.animate_piece_conversion(adj_row, adj_col, color)
-                    conversion_happened = True
+    # The engine has already flipped the captured pieces by the time this is called,
+    # so this only animates the cells that it reports back
+    def convert_adjacent_pieces(self, flipped, color):
+        for adj_row, adj_col in flipped:
+            self.animate_piece_conversion(adj_row, adj_col, color, self.active_player)
         
-        if conversion_happened:
-            sound = SoundLoader.load('./sound/conversion.mp3')
-            if sound:
-                sound.volume = 0.5
-                sound.play()
+        if flipped:
+            audio.play('conversion.mp3', volume=0.5)
 
     def clear_cell(self, row, col):
-        if (row, col) in self.circle_references:
-            references = self.circle_references.pop((row, col))
-            
-            circle = references.get('circle')
-            if circle and circle in self.canvas.children:
-                self.canvas.remove(circle)
-
-            shadow = references.get('shadow')
-            if shadow and shadow in self.canvas.children:
-                self.canvas.remove(shadow)
-
-        cell_x = self.grid_x + col * self.cell_size
-        cell_y = self.grid_y + row * self.cell_size
-
-        with self.canvas.before:
-            Color(0, 0, 0, 0)
-            Rectangle(pos=(cell_x, cell_y), size=(self.cell_size, self.cell_size))
-
-        self.canvas.ask_update()
+        graphics = self.cell_graphics.get((row, col))
+        if graphics is not None:
+            graphics.clear()
     
     # I referred to the documentation on animation from Kivy in order to understand how to implement
     # the animation for the animate_piece_conversion, animate_movement, and animate_jump
     # that are located below. I used components of the grid based structure in order to 
     # integrate it withinthe Kivy animation
     # https://kivy.org/doc/stable/api-kivy.animation.html
-    def animate_piece_conversion(self, row, col, target_color):
-        references = self.circle_references.get((row, col))
-        if not references:
+    def animate_piece_conversion(self, row, col, target_color, owner):
+        graphics = self.cell_graphics.get((row, col))
+        if graphics is None or not graphics.has_piece:
             return 
 
-        color_instruction = references['color']
+        graphics.owner = owner
+        self.animator.tween(graphics.color, 0.5, rgba=target_color)
 
-        anim = Animation(r=target_color[0], g=target_color[1], b=target_color[2], a=target_color[3], duration=0.5)
-        
-        def finalize_conversion(*_):
-            color_instruction.rgba = target_color
-
-        anim.bind(on_complete=finalize_conversion)
-        anim.start(color_instruction)
-
-    def animate_movement(self, src_row, src_col, target_row, target_col, is_jump=False):
+    def animate_movement(self, src_row, src_col, target_row, target_col):
+        src_x = self.grid_x + src_col * self.cell_size + self.cell_size / 2
+        src_y = self.grid_y + src_row * self.cell_size + self.cell_size / 2
         target_x = self.grid_x + target_col * self.cell_size + self.cell_size / 2
         target_y = self.grid_y + target_row * self.cell_size + self.cell_size / 2
 
-        with self.canvas:
-            Color(0, 0, 1, 1) if self.active_player == 1 else Color(1, 0, 0, 1)
-            moving_circle = Ellipse(pos=(target_x - self.cell_size / 4, target_y - self.cell_size / 4),
-                                    size=(self.cell_size / 2, self.cell_size / 2))
+        # The new piece grows out of the one it is cloned from
+        self.mover_color.rgba = (0, 0, 1, 1) if self.active_player == 1 else (1, 0, 0, 1)
+        self.mover.pos = (src_x - self.cell_size / 4, src_y - self.cell_size / 4)
+        self.mover.size = (self.cell_size / 2, self.cell_size / 2)
 
-        anim = Animation(pos=(target_x - self.cell_size / 4, target_y - self.cell_size / 4), duration=0.3)
-
-        anim.bind(on_complete=lambda *_: self.complete_move(src_row, src_col, target_row, target_col, is_jump))
-        anim.start(moving_circle)
+        self.animator.tween(self.mover, 0.3, pos=(target_x - self.cell_size / 4, target_y - self.cell_size / 4))
+        self.animator.call(lambda: self.land_move(src_row, src_col, target_row, target_col, False), delay=0.3)
 
     def animate_jump(self, src_row, src_col, target_row, target_col):
-        references = self.circle_references.get((src_row, src_col))        
-        src_circle = references['circle']
-        src_color = references['color']
-        src_owner = references['owner']
-        src_x, src_y = src_circle.pos
-        src_size = src_circle.size
+        graphics = self.cell_graphics[(src_row, src_col)]
+        src_x, src_y = graphics.circle.pos
+        src_size = graphics.circle.size
 
         target_x = self.grid_x + target_col * self.cell_size + self.cell_size / 2 - src_size[0] / 2
         target_y = self.grid_y + target_row * self.cell_size + self.cell_size / 2 - src_size[1] / 2
 
-        with self.canvas:
-            Color(r=src_color.r, g=src_color.g, b=src_color.b, a=src_color.a)
-            jumping_circle = Ellipse(pos=(src_x, src_y), size=src_size)
-
-        anim = (
-            Animation(pos=(target_x, target_y), duration=0.5, t="out_bounce") +
-            Animation(size=src_size, duration=0.2)
-        )
-
-        def finalize_jump(*_):
-            # Clear the source cell
-            self.clear_cell(src_row, src_col)
-
-            # Remove the temporary jumping circle
-            if jumping_circle in self.canvas.children:
-                self.canvas.remove(jumping_circle)
-
-            # Check if the source was an adjacent clone and clear it if necessary
-            if not references.get('is_starting_cell', False):
-                self.board_state[src_row][src_col] = 0
+        self.mover_color.rgba = graphics.color.rgba
+        self.mover.pos = (src_x, src_y)
+        self.mover.size = src_size
 
-            self.complete_move(src_row, src_col, target_row, target_col, is_jump=True)
-
-        anim.bind(on_complete=finalize_jump)
-        anim.start(jumping_circle)    
+        # The piece bounces onto the target and rests there for a moment before it lands
+        self.animator.tween(self.mover, 0.5, transition="out_bounce", pos=(target_x, target_y))
+        self.animator.call(lambda: self.land_move(src_row, src_col, target_row, target_col, True), delay=0.7)
     
     # I referred to the following red post in order to easily be able to implement the 
     # two player functionality in this game and have the player be able to switch
     # their turns:
     # https://www.reddit.com/r/learnprogramming/comments/17cvdx/python_how_do_i_swap_players_in_a_2player_game/
     def switch_turn(self):
-        if self.active_player == 1:
-            self.active_player = 2
+        self.update_turn_labels()
+        if self.active_player == 2 and self.is_vs_computer:
+            self.ai_event = Clock.schedule_once(lambda dt: self.trigger_ai_move(), self.ai_delay())
+        
+        print(f"Active Player: {self.active_player}")    
+
+        # A player that is blocked in has to pass, as long as the other player can still move
+        if not self.position.is_game_over() and not self.position.has_valid_moves(self.active_player):
+            if self.is_vs_computer and self.active_player == 2:
+                return
+            print(f"Player {self.active_player} has no valid moves and passes.")
+            self.save_clock()
+            self.position.make_pass()
+            self.switch_turn()
+        elif self.ponderer is not None and self.active_player == 1 and not self.position.is_game_over():
+            self.ponderer.start(self.position, self.think_time(self.position))
+
+    def update_turn_labels(self):
+        self.active_player = self.position.active_player
+        if self.clock:
+            self.clock.switch(self.active_player)
+            self.arm_flag()
+        if self.active_player == 2:
             self.player_1_label.color = (0.5, 0.5, 0.5, 1)
             self.player_2_label.color = (1, 0, 0, 1)
-            if self.is_vs_computer:
-                Clock.schedule_once(lambda dt: self.trigger_ai_move(), 1.5)
         else:
-            self.active_player = 1
             self.player_2_label.color = (0.5, 0.5, 0.5, 1)
             self.player_1_label.color = (0, 0, 1, 1)
-        
-        print(f"Active Player: {self.active_player}")    
+
+    def undo_move(self, instance):
+        if self.move_in_progress:
+            return
+        if not self.position.history:
+            print("There are no moves to undo.")
+            return
+
+        # Whatever the computer was about to do no longer applies
+        if self.ai_event is not None:
+            self.ai_event.cancel()
+        self.ai_worker.cancel()
+        if self.ponderer is not None:
+            self.ponderer.cancel()
+        if self.ai_character:
+            self.ai_character.set_thinking(False)
+
+        # Passes are taken back along with the move before them, and against the
+        # computer its reply is taken back too, so player 1 is always to move after
+        while self.position.history:
+            move = self.position.unmake_move()
+            mover = self.position.active_player
+            if move is not None and not (self.is_vs_computer and mover == 2):
+                break
+        if self.clock and len(self.position.history) in self.clock_states:
+            self.clock.restore(self.clock_states[len(self.position.history)])
+
+        self.remove_glow_effect()
+        self.remove_valid_cell_glow()
+        self.selected_circle = None
+        self.redraw_pieces()
+        self.update_piece_counts()
+        self.update_turn_labels()
+        if self.active_player == 2 and self.is_vs_computer:
+            self.ai_event = Clock.schedule_once(lambda dt: self.trigger_ai_move(), self.ai_delay())
+        elif self.ponderer is not None:
+            self.ponderer.start(self.position, self.think_time(self.position))
+
+    def redraw_pieces(self):
+        for graphics in self.cell_graphics.values():
+            graphics.clear()
+        for player, color in ((1, (0, 0, 1, 1)), (2, (1, 0, 0, 1))):
+            for row, col in self.position.cells_of(self.position.pieces[player]):
+                self.draw_circle(row, col, color, player)
+
+    def create_ai(self):
+        if self.settings.get("ai_engine") == "Neural Network":
+            return AtaxxAI(self.rows, self.cols)
+        if self.settings.get("ai_engine") == "Monte Carlo Tree Search":
+            return MCTSSearch(playouts=1000000, time_limit=self.settings.get("ai_think_time", 1.0))
+        return AlphaBetaSearch(time_limit=self.settings.get("ai_think_time", 1.0))
+
+    def ai_delay(self):
+        # The computer pauses before thinking so its moves are easy to follow,
+        # except in timed games, where the pause would come off its clock
+        return 0 if self.settings["timer_mode"] == "Limited" else 1.5
+
+    def think_time(self, position):
+        if self.settings["timer_mode"] == "Limited":
+            return self.time_manager.budget(position, self.clock.time_left(2), self.clock.increment)
+        return self.settings.get("ai_think_time", 1.0)
 
     def trigger_ai_move(self):
         if not hasattr(self, 'ai'):
-            self.ai = AtaxxAI(self.rows, self.cols)
-
-        if self.active_player != 2:
+            self.ai = self.create_ai()
+            endgame_empties = self.settings.get("endgame_empties", 6)
+            self.endgame_solver = EndgameSolver(
+                empties=endgame_empties, time_limit=self.settings.get("ai_think_time", 1.0) / 2
+            ) if endgame_empties else None
+            if self.settings.get("pondering", True) and isinstance(self.ai, AlphaBetaSearch):
+                self.ponderer = Ponderer(self.ai)
+
+        if self.active_player != 2 or self.position.is_game_over():
             print("It's not the AI's turn.")
             return
 
-        state = self.ai.get_state(self.board_state)
-        valid_moves = self.get_valid_moves()
-        
-        if not valid_moves:
+        if not self.position.has_valid_moves(2):
             print("AI has no valid moves.")
+            self.save_clock()
+            self.position.make_pass()
             self.switch_turn()
             return
 
+        if self.ai_character:
+            self.ai_character.set_thinking(True)
+
+        # The search works on its own copy of the position, so the board on screen
+        # is never touched from the background thread
+        position = self.position.copy()
+        time_limit = self.think_time(position)
+        # Pondering has to stop before the real search starts, as they share the search
+        pondered = self.ponderer.take(position) if self.ponderer is not None else None
+        self.ai_worker.start(lambda stop_event: self.think(position, stop_event, time_limit, pondered),
+                             self.play_ai_move, self.on_ai_error)
+
+    # This runs on the background thread, so it must not touch any widgets
+    def think(self, position, stop_event, time_limit, pondered=None):
         # I had to refer to the following documentation in order to implement the AI mechansim of the avatar
         # where I built a simple neural network architecture in a manner that it selects the move which maximizes 
         # the positive difference in the total pieces between the two teams
         # https://medium.com/technology-invention-and-more/how-to-build-a-simple-neural-network-in-9-lines-of-python-code-cc8f23647ca1
-        move = self.ai.get_action(state, valid_moves)
-        src_row, src_col, target_row, target_col = move
+        # The searches play straight from the opening book while the position is in
+        # it. The neural network always picks its own moves, since it learns from them.
+        move = None
+        if self.opening_book is not None and not isinstance(self.ai, AtaxxAI):
+            move = self.opening_book.probe(position)
+            if move is not None:
+                print(f"Computer plays book move {move}")
+                self.ai.last_result = None
+        # Close to the end the game is solved instead, whichever opponent was picked.
+        # If the solver can't prove a result in half the time, the opponent decides
+        # after all, in the time that is left.
+        if move is None and self.endgame_solver is not None and self.endgame_solver.applies_to(position):
+            result = self.endgame_solver.search(position, time_limit=time_limit / 2, stop_event=stop_event)
+            print(f"Computer endgame: {result}")
+            if result.margin is not None:
+                move = result.move
+                if hasattr(self.ai, "last_result"):
+                    self.ai.last_result = None
+            else:
+                # A time limit of 0 would mean no limit at all
+                time_limit = max(self.time_manager.min_time, time_limit - result.elapsed)
+        # On a ponder hit the search has already had the player's thinking time. It
+        # answers at once if that was enough, or else searches for the rest.
+        if move is None and pondered is not None:
+            print(f"Ponder hit: {pondered}")
+            if pondered.elapsed >= time_limit or abs(pondered.score) >= WIN_SCORE:
+                move = pondered.move
+                self.ai.last_result = None
+            else:
+                time_limit -= pondered.elapsed
+        if move is None:
+            move = self.ai.get_action(position, stop_event=stop_event, time_limit=time_limit)
+        if move is None or stop_event.is_set():
+            return None
 
-        distance = max(abs(src_row - target_row), abs(src_col - target_col))
-        if distance == 1:
-            self.animate_movement(src_row, src_col, target_row, target_col, is_jump=False)
-        elif distance == 2:
-            self.animate_jump(src_row, src_col, target_row, target_col)
+        state = self.ai.get_state(position) if isinstance(self.ai, AtaxxAI) else None
+        position.make_move(move)
+        reward = position.score(2)
+        next_state = self.ai.get_state(position) if isinstance(self.ai, AtaxxAI) else None
+        done = position.is_game_over()
+        position.unmake_move()
+
+        if isinstance(self.ai, AtaxxAI):
+            self.ai.remember(state, move, reward, next_state, done)
+            self.ai.replay(32)
 
-        self.board_state = self.ai.apply_move(self.board_state, move)
+        return move, reward
 
-        reward = self.calculate_reward()
+    # The search failed on the background thread (its traceback is printed there).
+    # Rather than leave the game waiting for a move, the computer plays a random one.
+    def on_ai_error(self, error):
+        print(f"Computer search failed ({error!r}), playing a random move instead")
+        moves = self.position.legal_moves()
+        self.play_ai_move((random.choice(moves), 0) if moves else None)
 
-        next_state = self.ai.get_state(self.board_state)
-        done = self.check_game_end()
-        self.ai.remember(state, move, reward, next_state, done)
+    def play_ai_move(self, outcome):
+        if self.ai_character:
+            self.ai_character.set_thinking(False)
+        if outcome is None:
+            return
+        move, result = outcome
+        src_row, src_col, target_row, target_col = move
 
-        self.ai.replay(32)
+        if getattr(self.ai, "last_result", None) is not None:
+            print(f"Computer search: {self.ai.last_result}")
+
+        self.play_move(src_row, src_col, target_row, target_col)
 
-        result = self.calculate_ai_result()
         if self.ai_character:
             self.ai_character.evaluate_outcome(result)
-    
-    def calculate_ai_result(self):
-        ai_pieces = sum(row.count(2) for row in self.board_state)
-        player_pieces = sum(row.count(1) for row in self.board_state)
-        return ai_pieces - player_pieces
-    
-    # I had to refer to the documentation on Attax to understand what the valid
-    # moves where for this game and be able to implement in a grid base approach
-    # as you can see below
-    # http://www.linuxonly.nl/docs/4/0_Ataxx.html
-    def get_valid_moves(self):
-        valid_moves = []
-        directions = [
-            (-1, 0), (1, 0), (0, -1), (0, 1),
-            (-2, 0), (2, 0), (0, -2), (0, 2),
-            (-1, -1), (-1, 1), (1, -1), (1, 1),
-            (-2, -2), (-2, 2), (2, -2), (2, 2)
-        ]
-        
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.board_state[row][col] == 2:
-                    for d_row, d_col in directions:
-                        target_row, target_col = row + d_row, col + d_col
-                        if 0 <= target_row < self.rows and 0 <= target_col < self.cols:
-                            if self.board_state[target_row][target_col] == 0:
-                                valid_moves.append((row, col, target_row, target_col))
-        return valid_moves
-
-    def calculate_reward(self):
-        ai_pieces = sum(row.count(2) for row in self.board_state)
-        player_pieces = sum(row.count(1) for row in self.board_state)
-        return ai_pieces - player_pieces
 
     def update_piece_counts(self):
-        player_1_count = sum(cell == 1 for row in self.board_state for cell in row)
-        player_2_count = sum(cell == 2 for row in self.board_state for cell in row)
+        player_1_count = self.position.piece_count(1)
+        player_2_count = self.position.piece_count(2)
         self.player_1_piece_count.text = f"Pieces: {player_1_count}"
         self.player_2_piece_count.text = f"Pieces: {player_2_count}"
     
@@ -1041,47 +1302,39 @@ class GameScreen(FloatLayout):
     # winning conditions for Attax and be able to implement it within this game:
     # https://skatgame.net/mburo/ggsa/ax.rules
     def check_game_end(self):
-        player_1_count = sum(cell == 1 for row in self.board_state for cell in row)
-        player_2_count = sum(cell == 2 for row in self.board_state for cell in row)
-
-        if player_1_count == 0:
-            self.end_game(winner=2)
-            return
-        elif player_2_count == 0:
-            self.end_game(winner=1)
-            return
-
-        total_pieces = player_1_count + player_2_count
-        total_cells = sum(cell != 9 for row in self.board_state for cell in row)
-        if player_1_count == total_cells or player_2_count == total_cells:
-            winner = 1 if player_1_count == total_cells else 2
-            self.end_game(winner=winner)
-            return
-
-        if not self.has_valid_moves(1) and not self.has_valid_moves(2):
-            winner = 1 if player_1_count > player_2_count else 2
-            self.end_game(winner=winner)
-
-
-    def has_valid_moves(self, player):
-        directions = [
-            (-1, 0), (1, 0), (0, -1), (0, 1),
-            (-2, 0), (2, 0), (0, -2), (0, 2),
-            (-1, -1), (-1, 1), (1, -1), (1, 1),
-            (-2, -2), (-2, 2), (2, -2), (2, 2),
-        ]
-        for row_idx, row in enumerate(self.board_state):
-            for col_idx, cell in enumerate(row):
-                if cell == player:
-                    for d_row, d_col in directions:
-                        target_row = row_idx + d_row
-                        target_col = col_idx + d_col
-                        if 0 <= target_row < self.rows and 0 <= target_col < self.cols:
-                            if self.board_state[target_row][target_col] == 0:
-                                return True
-        return False
+        if not self.position.is_game_over():
+            return False
+
+        # A drawn game has always been awarded to player 2
+        winner = self.position.winner() or 2
+        self.end_game(winner=winner)
+        return True
+
+    # Stops everything that would otherwise keep running after this game is over
+    # or replaced: the clock, a pending or running computer move, pondering and
+    # the worker processes of the Monte Carlo search
+    def shutdown(self):
+        self.timer_event.cancel()
+        self.animator.cancel()
+        if self.clock:
+            self.clock.stop()
+            self.arm_flag()
+        if self.ai_event is not None:
+            self.ai_event.cancel()
+        self.ai_worker.cancel()
+        if self.ponderer is not None:
+            self.ponderer.cancel()
+        if self.ai_character:
+            self.ai_character.set_thinking(False)
+        if hasattr(self, 'ai') and hasattr(self.ai, 'close'):
+            self.ai.close()
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
 
     def end_game(self, winner):
+        self.shutdown()
+
         screen_manager = self.parent.parent
         if not screen_manager:
             print("Error: ScreenManager not found!")
@@ -1096,10 +1349,7 @@ class GameScreen(FloatLayout):
     
     def play_game_over_sound(self, *args):
         """Play the game over sound."""
-        game_over_sound = SoundLoader.load('./sound/game-over.mp3')
-        if game_over_sound:
-            game_over_sound.volume = 0.8
-            game_over_sound.play()
+        audio.play('game-over.mp3', volume=0.8)
 
 class EndGameScreen(FloatLayout):
     def __init__(self, winner, screen_manager, **kwargs):
@@ -1111,7 +1361,7 @@ class EndGameScreen(FloatLayout):
             Color(0, 0, 0, 1)
             self.bg_base = Rectangle(size=self.size, pos=self.pos)
             Color(0.1, 0.5, 0.1, 1)
-            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, source="./image/grid_pattern.jpg")
+            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, texture=assets.texture("grid_pattern.jpg"))
         self.bind(size=self._update_bg, pos=self._update_bg)
 
         # Similar to beforen, I referred to the following documentation located below 
@@ -1189,13 +1439,14 @@ class MakeNewLevelScreen(FloatLayout):
         self.cols = cols
         self.grid = [[0 for _ in range(cols)] for _ in range(rows)]
         self.ataxx_start_screen = ataxx_start_screen
-        self.circle_references = {}
+        # The background and piece colour instructions of every cell, by (row, col)
+        self.cell_colors = {}
 
         with self.canvas.before:
             Color(0, 0, 0, 1)
             self.bg_base = Rectangle(size=self.size, pos=self.pos)
             Color(0.1, 0.5, 0.1, 1)
-            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, source="./image/grid_pattern.jpg")
+            self.bg_overlay = Rectangle(size=self.size, pos=self.pos, texture=assets.texture("grid_pattern.jpg"))
         self.bind(size=self._update_bg, pos=self._update_bg)
 
         padding = 10
@@ -1276,71 +1527,41 @@ class MakeNewLevelScreen(FloatLayout):
     # Make a New Level Screen:
     # https://kivy.org/doc/stable/examples/gen__canvas__lines_extended__py.html
     def draw_grid_with_lighting(self):
-        with self.canvas:
-            Color(0.1, 1, 0.1, 0.2)
-            for i in range(self.rows + 1):
-                y = self.grid_y + i * self.cell_size
-                Line(points=[self.grid_x, y, self.grid_x + self.cols * self.cell_size, y], width=5)
-            for j in range(self.cols + 1):
-                x = self.grid_x + j * self.cell_size
-                Line(points=[x, self.grid_y, x, self.grid_y + self.rows * self.cell_size], width=5)
-
-            Color(0.8, 0.8, 0.8, 1)
-            for i in range(self.rows + 1):
-                y = self.grid_y + i * self.cell_size
-                Line(points=[self.grid_x, y, self.grid_x + self.cols * self.cell_size, y], width=2)
-            for j in range(self.cols + 1):
-                x = self.grid_x + j * self.cell_size
-                Line(points=[x, self.grid_y, x, self.grid_y + self.rows * self.cell_size], width=2)
+        self.board = BoardWidget(self.rows, self.cols, self.cell_size, self.grid_x, self.grid_y)
+        self.board.add_lines((0.1, 1, 0.1, 0.2), 5)
+        self.board.add_lines((0.8, 0.8, 0.8, 1), 2)
+        self.board.bind(on_cell_press=lambda board, row, col: self.toggle_cell(row, col))
 
-        for row in range(self.rows):
-            for col in range(self.cols):
-                cell_button = Button(
-                    size_hint=(None, None),
-                    size=(self.cell_size, self.cell_size),
-                    pos=(self.grid_x + col * self.cell_size, self.grid_y + row * self.cell_size),
-                    background_normal="",
-                    background_color=(0, 0, 0, 0),
-                )
-                cell_button.bind(on_press=lambda instance, r=row, c=col: self.toggle_cell(r, c))
-                self.add_widget(cell_button)
+        # Every cell is drawn once here, and toggle_cell only changes its colours
+        radius = self.cell_size * 0.4
+        with self.board.canvas:
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    x, y = self.board.cell_pos(row, col)
+                    fill_color = Color(0, 0, 0, 0)
+                    Rectangle(pos=(x, y), size=(self.cell_size, self.cell_size))
+                    piece_color = Color(0, 0, 0, 0)
+                    Ellipse(pos=(x + self.cell_size / 2 - radius, y + self.cell_size / 2 - radius),
+                            size=(radius * 2, radius * 2))
+                    self.cell_colors[(row, col)] = (fill_color, piece_color)
+        self.add_widget(self.board)
 
     def toggle_cell(self, row, col):
         current_state = self.grid[row][col]
         new_state = (current_state + 1) % 4
         self.grid[row][col] = new_state
 
-        x = self.grid_x + col * self.cell_size
-        y = self.grid_y + row * self.cell_size
-        radius = self.cell_size * 0.4
-
-        with self.canvas:
-            Color(0, 0, 0, 1)
-            Rectangle(pos=(x, y), size=(self.cell_size, self.cell_size))
-            print(new_state)
-            if new_state == 1:
-                Color(0, 0, 1, 1)
-                Ellipse(pos=(x + self.cell_size / 2 - radius, y + self.cell_size / 2 - radius),
-                        size=(radius * 2, radius * 2))
-            elif new_state == 2:
-                Color(1, 0, 0, 1)
-                Ellipse(pos=(x + self.cell_size / 2 - radius, y + self.cell_size / 2 - radius),
-                        size=(radius * 2, radius * 2))
-            elif new_state == 3:
-                Color(0.5, 0.5, 0.5, 1)
-                Rectangle(pos=(x, y), size=(self.cell_size, self.cell_size))
-            
-        sound = SoundLoader.load('./sound/change-item.mp3')
-        if sound:
-            sound.volume = 0.5
-            sound.play()
+        fill_color, piece_color = self.cell_colors[(row, col)]
+        print(new_state)
+        fill_color.rgba = (0.5, 0.5, 0.5, 1) if new_state == 3 else (0, 0, 0, 1)
+        if new_state == 1:
+            piece_color.rgba = (0, 0, 1, 1)
+        elif new_state == 2:
+            piece_color.rgba = (1, 0, 0, 1)
         else:
-            print("Failed to load sound: change-item.mp3")
+            piece_color.rgba = (0, 0, 0, 0)
 
-    def clear_visual_cell(self, x, y):
-        with self.canvas.before:
-            Color(0, 0, 0, 0)
-            Rectangle(pos=(x, y), size=(self.cell_size, self.cell_size))
+        audio.play('change-item.mp3', volume=0.5)
 
     # Like before on the title screen, I had to refer to the offical documentation on Kivy 
     # buttons  in order to understand how to have their colors change dynamically 
@@ -1426,12 +1647,7 @@ class MakeNewLevelScreen(FloatLayout):
         ok_button.bind(on_press=popup.dismiss)
         popup.open()
 
-        sound = SoundLoader.load('./sound/error.mp3')
-        if sound:
-            sound.volume = 0.5
-            sound.play()
-        else:
-            print("Failed to load sound: change-item.mp3")
+        audio.play('error.mp3', volume=0.5)
 
     # I had to refer to the offical kivy documentation on how to 
     # be able have the save level popup appear for the user
@@ -1525,10 +1741,7 @@ class MakeNewLevelScreen(FloatLayout):
             auto_dismiss=False
         )
 
-        success_popup_sound = SoundLoader.load('./sound/successful.mp3')
-        if success_popup_sound:
-            success_popup_sound.volume = 0.8
-            success_popup_sound.play()
+        audio.play('successful.mp3', volume=0.8)
     
         ok_button.bind(on_press=success_popup.dismiss)
         ok_button.bind(on_press=self.go_back)
@@ -1545,109 +1758,40 @@ class MakeNewLevelScreen(FloatLayout):
     def reset_board(self):
         for row in range(self.rows):
             for col in range(self.cols):
-                x = self.grid_x + col * self.cell_size
-                y = self.grid_y + row * self.cell_size
-                self.clear_visual_cell(x, y)
+                self.clear_visual_cell(row, col)
 
         self.grid = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
 
-        self.draw_grid_with_lighting()
-
-    def clear_visual_cell(self, x, y):
-        with self.canvas:
-            Color(0, 0, 0, 1)
-            Rectangle(pos=(x, y), size=(self.cell_size, self.cell_size))
-
-        row = int((y - self.grid_y) // self.cell_size)
-        col = int((x - self.grid_x) // self.cell_size)
-        if (row, col) in self.circle_references:
-            del self.circle_references[(row, col)]
-
-class SimpleNN:
-    def __init__(self, input_size, hidden_size, output_size):
-        self.w1 = np.random.randn(input_size, hidden_size) / np.sqrt(input_size)
-        self.w2 = np.random.randn(hidden_size, output_size) / np.sqrt(hidden_size)
-
-    def forward(self, x):
-        self.z1 = np.dot(x, self.w1)
-        self.a1 = np.tanh(self.z1)
-        self.z2 = np.dot(self.a1, self.w2)
-        return self.z2
-
-    def backward(self, x, y, learning_rate=0.01):
-        self.forward(x)
-        delta2 = self.z2 - y
-        delta1 = np.dot(delta2, self.w2.T) * (1 - np.tanh(self.z1)**2)
-        self.w2 -= learning_rate * np.outer(self.a1, delta2)
-        self.w1 -= learning_rate * np.outer(x, delta1)
-
-class AtaxxAI:
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.model = SimpleNN(rows * cols, 64, 1)
-        self.memory = deque(maxlen=10000)
-        self.epsilon = 1.0
-        self.epsilon_min = 0.01
-        self.epsilon_decay = 0.995
-        self.gamma = 0.95
-
-    def get_state(self, board_state):
-        return np.array(board_state).flatten()
-
-    def get_action(self, state, valid_moves):
-        if np.random.rand() <= self.epsilon:
-            return random.choice(valid_moves)
-        
-        q_values = []
-        for move in valid_moves:
-            next_state = self.apply_move(state.reshape(self.rows, self.cols), move)
-            q_values.append(self.model.forward(next_state.flatten()))
-        
-        return valid_moves[np.argmax(q_values)]
+    def clear_visual_cell(self, row, col):
+        fill_color, piece_color = self.cell_colors[(row, col)]
+        fill_color.rgba = (0, 0, 0, 1)
+        piece_color.rgba = (0, 0, 0, 0)
 
-    def apply_move(self, state, move):
-        src_row, src_col, target_row, target_col = move
-        new_state = state.copy()
-        new_state[target_row][target_col] = 2
-        if max(abs(src_row - target_row), abs(src_col - target_col)) == 2:
-            new_state[src_row][src_col] = 0
-        return new_state
-
-    def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
-
-    def replay(self, batch_size):
-        if len(self.memory) < batch_size:
-            return
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                target = reward + self.gamma * np.max(self.model.forward(next_state))
-            target_f = self.model.forward(state)
-            target_f[0] = target
-            self.model.backward(state, target_f)
-        if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
-            
 class AICharacter:
     def __init__(self, game_screen):
         self.game_screen = game_screen
         self.images = {
-            'neutral': './image/bot/neutral_robot.png',
-            'happy': './image/bot/happy_robot.png',
-            'sad': './image/bot/sad_robot.png'
+            'neutral': 'bot/neutral_robot.png',
+            'happy': 'bot/happy_robot.png',
+            'sad': 'bot/sad_robot.png'
         }
         self.sounds = {
-            'happy': './sound/bot/happy.mp3',
-            'sad': './sound/bot/sad.mp3',
-            'neutral': './sound/bot/neutral.mp3',
+            'happy': 'bot/happy.mp3',
+            'sad': 'bot/sad.mp3',
+            'neutral': 'bot/neutral.mp3',
         }
         self.current_emotion = 'neutral'
-        self.image_widget = Image(source=self.images['neutral'])
+        self.image_widget = Image(texture=assets.texture(self.images['neutral']))
+        self.thinking_label = Label(
+            text="Thinking...",
+            font_size="18sp",
+            color=(1, 1, 1, 1),
+            size_hint=(None, None),
+            opacity=0,
+        )
         self.position_character()
         self.game_screen.add_widget(self.image_widget)
+        self.game_screen.add_widget(self.thinking_label)
 
     def position_character(self):
         # Position the character at the top-right of the grid
@@ -1657,18 +1801,32 @@ class AICharacter:
             self.game_screen.grid_x + self.game_screen.cell_size * self.game_screen.cols - 350,  # Move 50 pixels to the right
             self.game_screen.grid_y + self.game_screen.cell_size * self.game_screen.rows + 50   # Move 50 pixels up
         )
+        self.thinking_label.size = (150, 30)
+        self.thinking_label.pos = (self.image_widget.pos[0], self.image_widget.pos[1] - 30)
+
+    # While the computer is searching for a move, the robot is dimmed and a pulsing
+    # "Thinking..." label is shown underneath it
+    def set_thinking(self, thinking):
+        Animation.cancel_all(self.thinking_label)
+        if thinking:
+            self.image_widget.opacity = 0.6
+            self.thinking_label.opacity = 1
+            anim = Animation(opacity=0.3, duration=0.6) + Animation(opacity=1, duration=0.6)
+            anim.repeat = True
+            anim.start(self.thinking_label)
+        else:
+            self.image_widget.opacity = 1
+            self.thinking_label.opacity = 0
 
     def change_emotion(self, emotion):
         if emotion in self.images:
             self.current_emotion = emotion
-            self.image_widget.source = self.images[emotion]
+            self.image_widget.texture = assets.texture(self.images[emotion])
             self.play_sound(emotion)
 
     def play_sound(self, emotion):
         if emotion in self.sounds:
-            sound = SoundLoader.load(self.sounds[emotion])
-            if sound:
-                sound.play()
+            audio.play(self.sounds[emotion])
 
     def evaluate_outcome(self, result):
         print(result)
@@ -1681,12 +1839,18 @@ class AICharacter:
 
 class AtaxxApp(App):
     def build(self):
+        audio.set_volume(AtaxxStartScreen.settings["sound_volume"])
+        audio.set_muted(AtaxxStartScreen.settings["sound_muted"])
         screen_manager = ScreenManager()
         start_screen = Screen(name="start_screen")
         ataxx_start_screen = AtaxxStartScreen(screen_manager)
         start_screen.add_widget(ataxx_start_screen)
         screen_manager.add_widget(start_screen)
         ataxx_start_screen.play_background_music()
+        # Images, fonts and sound effects load while the title screen is shown, so
+        # the game screens don't stall the first time they need them
+        assets.start(on_progress=ataxx_start_screen.show_loading_progress,
+                     on_finish=ataxx_start_screen.loading_finished)
         return screen_manager
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""Perft move generation benchmark and correctness check.
+
+Counts the leaf nodes of the full game tree to a given depth from the starting
+position of levels in levels.txt, reports nodes/second and compares the counts
+against the reference counts stored in perft_reference.json. Clone moves count
+once per target cell and a forced pass counts as a move, as in other Ataxx
+engines, so "Level 1" gives the well known 16, 256, 6460, 155888, ...
+
+    python perft.py                      # every level up to its stored depth
+    python perft.py --level "Level 2" --depth 5
+    python perft.py --level "Level 1" --depth 3 --divide
+    python perft.py --depth 3 --update   # store the counts as new references
+
+The exit status is 1 if any count differs from its reference.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from ataxx_engine import AtaxxPosition, load_levels
+
+REFERENCE_FILE = "perft_reference.json"
+
+
+def perft(position, depth):
+    if depth == 0:
+        return 1
+    pieces = position.pieces
+    if not pieces[1] or not pieces[2]:
+        return 0
+    moves = position.legal_moves()
+    if not moves:
+        if not position.has_valid_moves(3 - position.active_player):
+            return 0
+        position.make_pass()
+        nodes = perft(position, depth - 1)
+        position.unmake_move()
+        return nodes
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move()
+    return nodes
+
+
+def divide(position, depth):
+    # Leaf counts below each root move, handy for tracking down a wrong count
+    counts = {}
+    for move in position.legal_moves():
+        position.make_move(move)
+        counts[move] = perft(position, depth - 1)
+        position.unmake_move()
+    return counts
+
+
+def load_references(path):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count Ataxx move generation leaf nodes (perft).")
+    parser.add_argument("--level", help="only run this level (default: every level)")
+    parser.add_argument("--levels-file", default="levels.txt")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="maximum depth (default: the deepest stored reference, or 3)")
+    parser.add_argument("--divide", action="store_true", help="print the counts below each root move")
+    parser.add_argument("--update", action="store_true", help=f"write the counts to {REFERENCE_FILE}")
+    parser.add_argument("--references", default=REFERENCE_FILE)
+    args = parser.parse_args()
+
+    levels = load_levels(args.levels_file)
+    if args.level:
+        levels = [level for level in levels if level["name"] == args.level]
+        if not levels:
+            parser.error(f"Level '{args.level}' not found in {args.levels_file}")
+
+    references = load_references(args.references)
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+
+    for level in levels:
+        position = AtaxxPosition.from_level(level)
+        key = position.fen()
+        stored = references.get(key, {}).get("counts", {})
+        max_depth = args.depth or max((int(depth) for depth in stored), default=3)
+        print(f"{level['name']}  [{key}]")
+
+        if args.divide:
+            for move, nodes in divide(position, max_depth).items():
+                print(f"  {move}: {nodes}")
+
+        counts = {}
+        for depth in range(1, max_depth + 1):
+            start = time.perf_counter()
+            nodes = perft(position, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            counts[str(depth)] = nodes
+
+            expected = stored.get(str(depth))
+            if expected is None:
+                status = "new"
+            elif expected == nodes:
+                status = "ok"
+            else:
+                status = f"FAIL (expected {expected})"
+                failures += 1
+            nps = nodes / elapsed if elapsed > 0 else 0
+            print(f"  depth {depth}: {nodes:>10} nodes  {elapsed:8.3f}s  {nps:>10.0f} nodes/s  {status}")
+
+        if args.update:
+            entry = references.setdefault(key, {"name": level["name"], "counts": {}})
+            entry["counts"].update(counts)
+
+    if args.update:
+        with open(args.references, "w") as file:
+            json.dump(references, file, indent=4)
+        print(f"Reference counts written to {args.references}")
+
+    if total_time > 0:
+        print(f"Total: {total_nodes} nodes in {total_time:.2f}s ({total_nodes / total_time:.0f} nodes/s)")
+    if failures:
+        print(f"{failures} count(s) did not match the reference")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from ataxx_engine import AtaxxPosition
+
+
+def board_with_blocked(cells):
+    board = [[0] * 7 for _ in range(7)]
+    board[0][0] = board[6][6] = 1
+    board[0][6] = board[6][0] = 2
+    for row, col in cells:
+        board[row][col] = 9
+    return board
+
+
+def canonical_key(board):
+    return AtaxxPosition.from_level({"name": "test", "board": board}).canonical_hash()[0]
+
+
+def test_blocked_layouts_with_equal_counts_hash_differently():
+    first = board_with_blocked([(2, 3), (4, 3), (3, 2), (3, 4)])
+    second = board_with_blocked([(2, 2), (2, 4), (4, 2), (4, 4)])
+    assert canonical_key(first) != canonical_key(second)
+
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""Engine-vs-engine tournaments without a window.
+
+Every pair of engines plays each level in levels.txt with both colours, over as
+many rounds as asked. A round starts from a few random moves that are the same
+for both colours, so neither engine profits from a lucky opening. Games run in
+parallel worker processes. The summary gives every pairing's wins, draws and
+losses with the Elo difference and its 95% confidence interval, and the
+throughput in games per minute. A game still going after MAX_PLIES plies is
+scored by piece count, and equal piece counts are a draw.
+
+With exactly two engines, --sprt stops the match as soon as a sequential
+probability ratio test decides between "the first engine is elo0 stronger" and
+"it is elo1 stronger".
+
+Engines are given as name[:option=value,...]:
+
+    random                      uniformly random moves
+    greedy                      the move that leaves the best piece difference
+    nn                          AtaxxAI with the newest checkpoint, never exploring
+    alphabeta[:time=,depth=,eval=feature|material]
+    mcts[:time=,playouts=]
+
+    python tournament.py alphabeta:depth=3 alphabeta:depth=3,eval=material --rounds 20
+    python tournament.py alphabeta:time=0.1 greedy random nn --rounds 4
+    python tournament.py alphabeta:depth=2 greedy --rounds 200 --sprt 0 50
+"""
+
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ataxx_engine import AtaxxPosition, load_levels
+
+# Games are stopped after this many plies and scored by piece count
+MAX_PLIES = 400
+
+
+class RandomEngine:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def get_action(self, position):
+        moves = position.legal_moves()
+        return self.rng.choice(moves) if moves else None
+
+
+class GreedyEngine:
+    # Picks the move that leaves the best piece difference, ties at random
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def get_action(self, position):
+        player = position.active_player
+        best_moves, best_score = [], None
+        for move in position.legal_moves():
+            position.make_move(move)
+            score = position.score(player)
+            position.unmake_move()
+            if best_score is None or score > best_score:
+                best_moves, best_score = [move], score
+            elif score == best_score:
+                best_moves.append(move)
+        return self.rng.choice(best_moves) if best_moves else None
+
+
+ENGINES = ("random", "greedy", "nn", "alphabeta", "mcts")
+
+
+def parse_engine(spec):
+    name, _, options = spec.partition(":")
+    values = {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        values[key.strip()] = value.strip()
+    return name.strip(), values
+
+
+def make_engine(spec, rows, cols):
+    # The heavier imports only happen in the processes that need them
+    name, options = parse_engine(spec)
+    time_limit = float(options["time"]) if "time" in options else None
+    if name == "random":
+        return RandomEngine()
+    if name == "greedy":
+        return GreedyEngine()
+    if name == "nn":
+        from ataxx_ai import AtaxxAI
+        ai = AtaxxAI(rows, cols)
+        ai.epsilon = 0.0
+        return ai
+    if name == "alphabeta":
+        from ataxx_eval import FeatureEvaluator, MaterialEvaluator
+        from ataxx_search import AlphaBetaSearch
+        evaluator = MaterialEvaluator() if options.get("eval") == "material" else FeatureEvaluator()
+        if time_limit is None and "depth" not in options:
+            time_limit = 0.1
+        return AlphaBetaSearch(time_limit=time_limit, max_depth=int(options.get("depth", 64)), evaluator=evaluator)
+    if name == "mcts":
+        from ataxx_mcts import MCTSSearch
+        # Games already run in parallel, so each search stays in its own process
+        return MCTSSearch(playouts=int(options.get("playouts", 1000)), workers=1, time_limit=time_limit)
+    raise ValueError(f"Unknown engine '{spec}'")
+
+
+# Engines are kept for the life of a worker process, so searches keep their
+# transposition tables and the network is only loaded once per board size
+_engines = {}
+
+
+def get_engine(spec, rows, cols):
+    key = (spec, rows, cols)
+    if key not in _engines:
+        _engines[key] = make_engine(spec, rows, cols)
+    return _engines[key]
+
+
+def play_game(first, second, level, first_player, opening_seed, random_plies):
+    # Plays one game and returns the score of the first engine (1, 0.5 or 0)
+    rows, cols = level["size"]
+    engines = {first_player: get_engine(first, rows, cols), 3 - first_player: get_engine(second, rows, cols)}
+    position = AtaxxPosition.from_level(level)
+    rng = random.Random(opening_seed)
+    for _ in range(random_plies):
+        moves = position.legal_moves()
+        if position.is_game_over() or not moves:
+            break
+        position.make_move(rng.choice(moves))
+
+    plies = 0
+    while plies < MAX_PLIES and not position.is_game_over():
+        if not position.has_valid_moves():
+            position.make_pass()
+            continue
+        position.make_move(engines[position.active_player].get_action(position))
+        plies += 1
+
+    margin = position.score(first_player)
+    return 1.0 if margin > 0 else 0.5 if margin == 0 else 0.0
+
+
+def elo_difference(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_interval(results):
+    # Elo difference and its 95% confidence interval from a list of game scores
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((result - mean) ** 2 for result in results) / n
+    margin = 1.96 * math.sqrt(variance / n)
+    return elo_difference(mean), elo_difference(mean - margin), elo_difference(mean + margin)
+
+
+def sprt_llr(results, elo0, elo1):
+    # Log-likelihood ratio of elo1 against elo0 (generalised SPRT with a normal
+    # approximation of the game scores). A win, a draw and a loss are added as a
+    # prior, so a match that only has wins so far still has a variance.
+    results = list(results) + [1.0, 0.5, 0.0]
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((result - mean) ** 2 for result in results) / n
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return n * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+
+def get_executor(workers):
+    # Forking keeps the worker start-up cheap where it is available
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play an Ataxx engine tournament.")
+    parser.add_argument("engines", nargs="+", help="engines to play, e.g. alphabeta:depth=3 greedy random")
+    parser.add_argument("--rounds", type=int, default=2, help="rounds of every level with both colours per pairing")
+    parser.add_argument("--level", action="append", help="only play these levels (default: every level)")
+    parser.add_argument("--levels-file", default="levels.txt")
+    parser.add_argument("--random-plies", type=int, default=2, help="random opening moves of every game pair")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"),
+                        help="stop a two-engine match once SPRT accepts elo0 or elo1 for the first engine")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT false negative rate")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if len(args.engines) < 2:
+        parser.error("at least two engines are needed")
+    for spec in args.engines:
+        if parse_engine(spec)[0] not in ENGINES:
+            parser.error(f"Unknown engine '{spec}', expected one of {', '.join(ENGINES)}")
+    if args.sprt and len(args.engines) != 2:
+        parser.error("--sprt needs exactly two engines")
+
+    levels = load_levels(args.levels_file)
+    if args.level:
+        levels = [level for level in levels if level["name"] in args.level]
+    levels = [level for level in levels if not AtaxxPosition.from_level(level).is_game_over()]
+    if not levels:
+        parser.error("no playable levels")
+
+    # Games are listed round by round so an early stop still covers every level
+    rng = random.Random(args.seed)
+    pairings = list(itertools.combinations(args.engines, 2))
+    games = []
+    for _ in range(args.rounds):
+        for level in levels:
+            for pairing in pairings:
+                opening_seed = rng.getrandbits(32)
+                for first_player in (1, 2):
+                    games.append((pairing, level, first_player, opening_seed))
+
+    results = {pairing: [] for pairing in pairings}
+    lower_bound = math.log(args.beta / (1 - args.alpha))
+    upper_bound = math.log((1 - args.beta) / args.alpha)
+    verdict = None
+    start = time.perf_counter()
+    executor = get_executor(args.workers)
+    try:
+        futures = {executor.submit(play_game, pairing[0], pairing[1], level, first_player, opening_seed,
+                                   args.random_plies): pairing
+                   for pairing, level, first_player, opening_seed in games}
+        pending = set(futures)
+        while pending and verdict is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]].append(future.result())
+            if args.sprt:
+                llr = sprt_llr(results[pairings[0]], *args.sprt)
+                if llr >= upper_bound:
+                    verdict = f"H1 accepted (elo >= {args.sprt[1]:g}), LLR {llr:.2f}"
+                elif llr <= lower_bound:
+                    verdict = f"H0 accepted (elo <= {args.sprt[0]:g}), LLR {llr:.2f}"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    elapsed = time.perf_counter() - start
+
+    played = 0
+    for (first, second), scores in results.items():
+        if not scores:
+            continue
+        played += len(scores)
+        wins = scores.count(1.0)
+        draws = scores.count(0.5)
+        losses = scores.count(0.0)
+        elo, low, high = elo_interval(scores)
+        print(f"{first} vs {second}: +{wins} ={draws} -{losses}  score {100 * sum(scores) / len(scores):.1f}%  "
+              f"Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}]")
+    if args.sprt:
+        llr = sprt_llr(results[pairings[0]], *args.sprt)
+        print(f"SPRT ({args.sprt[0]:g}, {args.sprt[1]:g}): {verdict or f'no decision, LLR {llr:.2f}'} "
+              f"[{lower_bound:.2f}, {upper_bound:.2f}]")
+    print(f"{played} games in {elapsed:.1f}s ({60 * played / elapsed:.1f} games/min, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Headless self-play trainer for the SimpleNN used by AtaxxAI.
+
+Plays games on a level from levels.txt without opening a window, either with the
+network playing both sides or against the alpha-beta search, trains the network
+on minibatches from its replay memory and writes versioned checkpoints to the
+models directory. Boards are stored in canonical orientation (see ataxx_symmetry)
+so mirrored positions don't take up extra room in the replay memory; pass
+--no-symmetry to train on them as played. The game loads the newest checkpoint
+for the board size when the Neural Network opponent is picked.
+
+    python train_selfplay.py --games 2000 --level "Level 1" --opponent self
+    python train_selfplay.py --games 500 --opponent alphabeta --search-time 0.05
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ataxx_ai import AtaxxAI, latest_checkpoint, save_checkpoint
+from ataxx_engine import AtaxxPosition, load_levels
+from ataxx_search import AlphaBetaSearch
+
+# Games are stopped after this many plies and scored by piece count
+MAX_PLIES = 400
+
+
+def play_game(ai, position, opponent, ai_player, batch_size, train_every):
+    # Plays one game from the position and returns the winner (0 for a draw).
+    # Every move the network makes is remembered and it is trained as it goes.
+    plies = 0
+    while plies < MAX_PLIES and not position.is_game_over():
+        if not position.has_valid_moves():
+            position.make_pass()
+            continue
+
+        network_to_move = opponent is None or position.active_player == ai_player
+        if network_to_move:
+            state = ai.get_state(position)
+            move = ai.get_action(position)
+        else:
+            move = opponent.get_action(position)
+
+        position.make_move(move)
+        plies += 1
+
+        if network_to_move:
+            ai.remember(state, move, position.score(2), ai.get_state(position), position.is_game_over())
+            if plies % train_every == 0:
+                ai.replay(batch_size)
+
+    if position.is_game_over():
+        return position.winner()
+    # A game that hit the ply cap goes to whoever has more pieces
+    player_1_count, player_2_count = position.counts[1], position.counts[2]
+    if player_1_count == player_2_count:
+        return 0
+    return 1 if player_1_count > player_2_count else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Ataxx neural network by self-play.")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--level", default="Level 1", help="name of the level in levels.txt to play on")
+    parser.add_argument("--levels-file", default="levels.txt")
+    parser.add_argument("--opponent", choices=["self", "alphabeta"], default="self",
+                        help="play the network against itself or against the alpha-beta search")
+    parser.add_argument("--search-time", type=float, default=0.05, help="seconds per move for the alpha-beta opponent")
+    parser.add_argument("--search-depth", type=int, default=2, help="maximum depth for the alpha-beta opponent")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--train-every", type=int, default=4, help="train on one minibatch every N network moves")
+    parser.add_argument("--checkpoint-every", type=int, default=200, help="write a checkpoint every N games")
+    parser.add_argument("--no-symmetry", action="store_true",
+                        help="don't turn boards into their canonical orientation before training")
+    parser.add_argument("--fresh", action="store_true", help="start from random weights instead of the latest checkpoint")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        # The network's weights and its exploration draw from NumPy's generator
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    level = next((level for level in load_levels(args.levels_file) if level["name"] == args.level), None)
+    if level is None:
+        parser.error(f"Level '{args.level}' not found in {args.levels_file}")
+    rows, cols = level["size"]
+
+    ai = AtaxxAI(rows, cols, load_checkpoint=not args.fresh, use_symmetry=not args.no_symmetry, seed=args.seed)
+    if ai.checkpoint:
+        print(f"Continuing from {ai.checkpoint}")
+    opponent = None
+    if args.opponent == "alphabeta":
+        opponent = AlphaBetaSearch(time_limit=args.search_time, max_depth=args.search_depth)
+
+    results = {0: 0, 1: 0, 2: 0}
+    start = time.perf_counter()
+    for game in range(1, args.games + 1):
+        # Against the search the network alternates colours every game
+        ai_player = 2 if game % 2 else 1
+        position = AtaxxPosition.from_level(level)
+        winner = play_game(ai, position, opponent, ai_player, args.batch_size, args.train_every)
+        if opponent is not None:
+            winner = {ai_player: 1, 3 - ai_player: 2}.get(winner, 0)
+        results[winner] += 1
+
+        if game % args.checkpoint_every == 0 or game == args.games:
+            elapsed = time.perf_counter() - start
+            path = save_checkpoint(ai.model, rows, cols)
+            label = "network wins/losses" if opponent is not None else "player 1/player 2 wins"
+            print(f"{game} games, {game / elapsed:.2f} games/s, {label} {results[1]}/{results[2]}, "
+                  f"draws {results[0]}, epsilon {ai.epsilon:.3f}, {len(ai.memory)} distinct transitions -> {path}")
+
+    latest = latest_checkpoint(rows, cols)
+    print(f"Done. Latest checkpoint: {latest[1] if latest else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""Fits the FeatureEvaluator weights to self-play results.
+
+Plays self-play games of a shallow alpha-beta search using the current weights,
+starting each game with a few random moves so the games differ, and records
+every position together with how the game ended for the side to move. The
+features of all positions are then computed in one go with board_features and
+a logistic regression from the features to the result is fitted, so that the
+weighted sum predicts who wins. The weights are rescaled to make material worth
+exactly one piece and written to eval_weights.json, which the searches load.
+
+    python tune_eval.py --games 200 --depth 2
+    python tune_eval.py --level "Level 1" --games 500 --epochs 3000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ataxx_engine import AtaxxPosition, load_levels
+from ataxx_eval import (FEATURES, WEIGHTS_FILE, FeatureEvaluator, board_features, load_weights, position_features,
+                        save_weights)
+from ataxx_search import AlphaBetaSearch
+
+# Games are stopped after this many plies and scored by piece count
+MAX_PLIES = 400
+
+
+def play_game(level, search, random_plies, rng):
+    # Returns the (board, side to move, features) of every position after the
+    # random opening, and the winner (0 for a draw)
+    position = AtaxxPosition.from_level(level)
+    positions = []
+    for ply in range(MAX_PLIES):
+        if position.is_game_over():
+            break
+        moves = position.legal_moves()
+        if not moves:
+            position.make_pass()
+            continue
+        if ply < random_plies:
+            move = rng.choice(moves)
+        else:
+            positions.append((position.board, position.active_player, position_features(position)))
+            move = search.get_action(position)
+        position.make_move(move)
+    winner = position.winner()
+    if winner is None:
+        winner = 1 if position.score(1) > 0 else 2 if position.score(1) < 0 else 0
+    return positions, winner
+
+
+def fit(features, results, weights, epochs, learning_rate, l2):
+    # Logistic regression by gradient descent, starting from the current weights.
+    # Features are standardised while fitting so one learning rate suits them all.
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    x = features / scale
+    w = np.array([weights[feature] for feature in FEATURES]) * scale
+    for _ in range(epochs):
+        predicted = 1 / (1 + np.exp(-(x @ w)))
+        gradient = x.T @ (predicted - results) / len(x) + l2 * w
+        w -= learning_rate * gradient
+    w /= scale
+    return w
+
+
+def log_loss(features, results, w):
+    predicted = np.clip(1 / (1 + np.exp(-(features @ w))), 1e-9, 1 - 1e-9)
+    return float(-np.mean(results * np.log(predicted) + (1 - results) * np.log(1 - predicted)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the Ataxx evaluation weights from self-play.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--level", help="only play this level (default: every level)")
+    parser.add_argument("--levels-file", default="levels.txt")
+    parser.add_argument("--depth", type=int, default=2, help="search depth of the self-play games")
+    parser.add_argument("--random-plies", type=int, default=4, help="random moves at the start of every game")
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--l2", type=float, default=1e-4, help="weight decay of the regression")
+    parser.add_argument("--output", default=WEIGHTS_FILE)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    levels = load_levels(args.levels_file)
+    if args.level:
+        levels = [level for level in levels if level["name"] == args.level]
+        if not levels:
+            parser.error(f"Level '{args.level}' not found in {args.levels_file}")
+
+    weights = load_weights(args.output)
+    search = AlphaBetaSearch(time_limit=None, max_depth=args.depth, evaluator=FeatureEvaluator(weights))
+
+    # Boards of different sizes can't share an array, so features are gathered per game
+    start = time.perf_counter()
+    feature_rows = []
+    result_rows = []
+    for game in range(args.games):
+        positions, winner = play_game(levels[game % len(levels)], search, args.random_plies, rng)
+        if not positions:
+            continue
+        boards, players, expected = zip(*positions)
+        players = np.array(players)
+        features = board_features(np.array(boards), players)
+        # The search scores positions with position_features, so the weights are
+        # only right for it if both compute the same thing
+        if not np.array_equal(features, np.array(expected)):
+            raise RuntimeError("board_features disagrees with position_features")
+        feature_rows.append(features)
+        result_rows.append(np.where(players == winner, 1.0, np.where(winner == 0, 0.5, 0.0)))
+    elapsed = time.perf_counter() - start
+    features = np.concatenate(feature_rows).astype(float)
+    results = np.concatenate(result_rows)
+    print(f"{args.games} games, {len(features)} positions in {elapsed:.1f}s ({args.games / elapsed:.2f} games/s)")
+
+    w = fit(features, results, weights, args.epochs, args.learning_rate, args.l2)
+    # The old weights are compared at the same scale as the fitted ones
+    before = np.array([weights[feature] for feature in FEATURES]) * w[0] / weights["material"]
+    print(f"log loss {log_loss(features, results, before):.4f} -> {log_loss(features, results, w):.4f}")
+
+    if w[0] <= 0:
+        print("Material came out with a weight of zero or less, weights not saved")
+        return
+    tuned = {feature: weight / w[0] for feature, weight in zip(FEATURES, w)}
+    for feature in FEATURES:
+        print(f"  {feature:<10} {weights[feature]:>8.3f} -> {tuned[feature]:>8.3f}")
+    save_weights(tuned, args.output)
+    print(f"Weights written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()